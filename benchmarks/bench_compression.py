@@ -0,0 +1,55 @@
+"""
+Write time, read time and file size of a sample parquet file for the supported codecs.
+
+Usage (with fastTGA installed, e.g. `pip install -e .`):
+    python benchmarks/bench_compression.py [path/to/export.txt | path/to/sample.parquet]
+
+Without a path a synthetic sample with 500k rows is used.
+"""
+import os
+import sys
+import tempfile
+
+import polars as pl
+
+from fastTGA.models.tga_file import TGAFile
+from synthetic_data import best_of, make_sample_frame
+
+
+CONFIGURATIONS = [
+    {"compression": "gzip"},
+    {"compression": "zstd", "compression_level": 1},
+    {"compression": "zstd"},
+    {"compression": "zstd", "compression_level": 9},
+    {"compression": "lz4"},
+    {"compression": "snappy"},
+    {"compression": "uncompressed"},
+    {"compression": "zstd", "row_group_size": 16_384},
+]
+
+
+def load_frame(path):
+    if path is None:
+        return make_sample_frame(500_000, time_step_s=0.1)
+    if path.endswith(".parquet"):
+        return pl.read_parquet(path)
+    return TGAFile(path).data
+
+
+def main(path):
+    df = load_frame(path)
+    print(f"{df.height} rows, {df.width} columns, {df.estimated_size() / 1e6:.1f} MB in memory")
+    print(f"{'options':<50} {'write ms':>9} {'read ms':>9} {'size MB':>8}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        target = os.path.join(directory, "sample.parquet")
+        for options in CONFIGURATIONS:
+            write, _ = best_of(lambda: df.write_parquet(target, **options), repeat=5)
+            read, _ = best_of(lambda: pl.read_parquet(target), repeat=5)
+            size = os.path.getsize(target) / 1e6
+            label = ", ".join(f"{k}={v}" for k, v in options.items())
+            print(f"{label:<50} {write * 1000:>9.1f} {read * 1000:>9.1f} {size:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,70 @@
+"""
+Speed and peak fidelity of the downsampling methods (fastTGA.models.downsampling) on a synthetic run
+from 25 to 1000 °C at 10 K/min with a broad mass loss step and a sharp one (a phase transition) at 800 °C.
+
+For every method and data size it reports the time (best of 3), the number of kept rows and, compared with
+the noise free signal at full resolution:
+  • peak rate err: relative error of the highest mass loss rate of the sharp step (central difference dm/dt)
+  • peak T err: error of the temperature at which that rate occurs
+  • step err: largest error of the linearly interpolated mass around the sharp step
+
+Usage (with fastTGA installed, e.g. `pip install -e .`):
+    python benchmarks/bench_downsampling.py [every_s] [n_rows ...]
+"""
+import sys
+
+import numpy as np
+import polars as pl
+
+from fastTGA.models.derivatives import Derivative
+from fastTGA.models.downsampling import DOWNSAMPLERS, make_downsampler
+from synthetic_data import best_of
+
+
+DURATION_S = (1000 - 25) * 6.0
+
+
+def make_run(n_rows, seed=0):
+    """Returns the noisy sample frame and the noise free mass."""
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, DURATION_S, n_rows)
+    temperature = 25.0 + t / 6.0
+    # logistic steps, written with tanh to avoid overflow far from the step
+    mass = -2.0 * (1 + np.tanh((temperature - 600.0) / 30.0)) - 0.25 * (1 + np.tanh(temperature - 800.0))
+    df = pl.DataFrame({
+        "t_s": t,
+        "T_C": temperature,
+        "dm_mg": mass + rng.normal(0, 0.002, n_rows),
+        "purge_l_min": np.full(n_rows, 50.0),
+    })
+    return df, mass
+
+
+def peak_rate(df):
+    """Highest mass loss rate and its temperature between 780 and 820 °C."""
+    rate = Derivative(method="central").apply(df).filter(pl.col("T_C").is_between(780, 820))
+    peak = rate.row(rate["dmdt_mg_s"].arg_min(), named=True)
+    return peak["dmdt_mg_s"], peak["T_C"]
+
+
+def main(every_s, sizes):
+    print(f"every_s = {every_s}")
+    print(f"{'rows':>9} {'method':<9} {'ms':>8} {'kept':>7} {'peak rate err':>14} {'peak T err':>11} {'step err':>9}")
+    for n_rows in sizes:
+        df, mass = make_run(n_rows)
+        true_rate, true_T = peak_rate(df.with_columns(dm_mg=pl.Series(mass)))
+        around_step = (df["T_C"] > 790).to_numpy() & (df["T_C"] < 810).to_numpy()
+
+        for method in DOWNSAMPLERS:
+            downsampler = make_downsampler(method, every_s)
+            seconds, out = best_of(lambda: downsampler.apply(df))
+            rate, temperature = peak_rate(out)
+            interpolated = np.interp(df["t_s"].to_numpy(), out["t_s"].to_numpy(), out["dm_mg"].to_numpy())
+            step_error = np.abs(interpolated - mass)[around_step].max()
+            print(f"{n_rows:>9} {method:<9} {seconds * 1000:>8.1f} {out.height:>7} "
+                  f"{abs(rate / true_rate - 1):>13.1%} {abs(temperature - true_T):>9.2f} C {step_error:>7.3f}mg")
+
+
+if __name__ == "__main__":
+    every = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    main(every, [int(arg) for arg in sys.argv[2:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,76 @@
+"""
+Cold and warm read latency of SampleRepository.select() for gzip parquet (the format of older datasets),
+zstd parquet and the memory mapped Arrow IPC storage (uncompressed and lz4).
+
+"cold" drops the sample files from the OS page cache before reading (posix_fadvise, Linux only; elsewhere
+it is the first read after writing), "warm" is the best of repeated reads with the page cache filled.
+The in-process sample cache is disabled, so every select() reads the files.
+
+Usage (with fastTGA installed, e.g. `pip install -e .`):
+    python benchmarks/bench_ipc.py [n_samples] [n_rows_per_sample]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from fastTGA.models.dataset_layout import FORMAT_IPC, FORMAT_PARQUET, convert_format
+from fastTGA.services.sample_repository import SampleRepository
+from synthetic_data import write_dataset
+
+
+CONFIGURATIONS = [
+    ("parquet gzip", None, {}),
+    ("parquet zstd", FORMAT_PARQUET, {"compression": "zstd"}),
+    ("ipc uncompressed", FORMAT_IPC, {"compression": "uncompressed"}),
+    ("ipc lz4", FORMAT_IPC, {"compression": "lz4"}),
+]
+
+
+def drop_page_cache(folder):
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for root, _, filenames in os.walk(folder):
+        for filename in filenames:
+            fd = os.open(os.path.join(root, filename), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+
+def read_all(folder):
+    repo = SampleRepository(folder, cache_max_bytes=0)
+    start = time.perf_counter()
+    rows = sum(sample["data"].height for sample in repo.select())
+    return time.perf_counter() - start, rows
+
+
+def folder_size(folder):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(folder) for f in files)
+
+
+def main(n_samples, n_rows):
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "gzip")
+        write_dataset(source, n_samples, n_rows, compression="gzip")
+
+        print(f"{n_samples} samples x {n_rows} rows")
+        print(f"{'storage':<18} {'cold ms':>9} {'warm ms':>9} {'size MB':>8}")
+        for name, storage_format, options in CONFIGURATIONS:
+            folder = os.path.join(directory, name.replace(" ", "_"))
+            shutil.copytree(source, folder)
+            if storage_format is not None:
+                convert_format(folder, storage_format, **options)
+
+            drop_page_cache(folder)
+            cold, _ = read_all(folder)
+            warm = min(read_all(folder)[0] for _ in range(5))
+            print(f"{name:<18} {cold * 1000:>9.1f} {warm * 1000:>9.1f} {folder_size(folder) / 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args or [100, 100_000]))
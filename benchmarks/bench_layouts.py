@@ -0,0 +1,54 @@
+"""
+Compare the sample_{id}.parquet layout with the consolidated hive partitioned layout on a
+cross-sample query: all rows with 600 <= T_C <= 700 of the "Washed" samples.
+
+Usage (with fastTGA installed, e.g. `pip install -e .`):
+    python benchmarks/bench_layouts.py [n_samples] [n_rows_per_sample]
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import polars as pl
+
+from fastTGA.models.dataset_layout import migrate_to_hive
+from fastTGA.services.sample_repository import SampleRepository
+from synthetic_data import best_of, write_dataset
+
+
+def per_file_query(folder):
+    repo = SampleRepository(folder).filter("Sample Condition", "Washed")
+    frames = [s["data"].filter(pl.col("T_C").is_between(600, 700)).select("t_s", "T_C", "dm_mg")
+              for s in repo.select()]
+    return sum(f.height for f in frames)
+
+
+def scan_query(folder):
+    repo = SampleRepository(folder).filter("Sample Condition", "Washed")
+    return (repo.scan_samples()
+            .filter(pl.col("T_C").is_between(600, 700))
+            .select("id", "t_s", "T_C", "dm_mg")
+            .collect()
+            .height)
+
+
+def main(n_samples, n_rows):
+    with tempfile.TemporaryDirectory() as directory:
+        files_folder = os.path.join(directory, "files")
+        hive_folder = os.path.join(directory, "hive")
+        write_dataset(files_folder, n_samples, n_rows)
+        shutil.copytree(files_folder, hive_folder)
+        migrate_to_hive(hive_folder, remove_old=True)
+
+        print(f"{n_samples} samples x {n_rows} rows")
+        for name, func, folder in [("files, select() loop", per_file_query, files_folder),
+                                   ("files, scan_samples()", scan_query, files_folder),
+                                   ("hive,  scan_samples()", scan_query, hive_folder)]:
+            seconds, rows = best_of(lambda: func(folder))
+            print(f"{name:<24} {seconds:8.3f} s  ({rows} rows)")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args or [200, 50_000]))
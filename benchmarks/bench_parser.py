@@ -0,0 +1,30 @@
+"""
+Compare the legacy two-pass parser of TGAFile against the single-pass parser.
+
+Usage (with fastTGA installed, e.g. `pip install -e .`):
+    python benchmarks/bench_parser.py [n_rows ...]
+"""
+import os
+import sys
+import tempfile
+
+from fastTGA.models.tga_file import TGAFile
+from synthetic_data import best_of, write_tga_export
+
+
+def main(row_counts):
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'rows':>10} {'size MB':>8} {'legacy s':>9} {'single s':>9} {'speedup':>8}")
+        for n_rows in row_counts:
+            path = os.path.join(directory, f"RT{n_rows}.txt")
+            write_tga_export(path, n_rows)
+            size_mb = os.path.getsize(path) / 1e6
+
+            legacy, _ = best_of(lambda: TGAFile(path, single_pass=False))
+            single, _ = best_of(lambda: TGAFile(path, single_pass=True))
+            print(f"{n_rows:>10} {size_mb:>8.1f} {legacy:>9.3f} {single:>9.3f} {legacy / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000, 3_000_000]
+    main(counts)
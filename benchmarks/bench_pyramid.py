@@ -0,0 +1,44 @@
+"""
+Overview query over all samples of a dataset: every sample at full resolution compared with the pyramid
+level picked for a budget of about 2000 points per curve (SampleRepository.pyramid_level).
+
+Reports the time of select() and of a scan() collecting t_s / dm_mg of all samples (best of 3), and the
+bytes of the files that are read.
+
+Usage (with fastTGA installed, e.g. `pip install -e .`):
+    python benchmarks/bench_pyramid.py [n_samples] [n_rows_per_sample] [points]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from fastTGA.models.dataset_layout import build_pyramid, pyramid_path, LAYOUT_FILES
+from fastTGA.services.sample_repository import SampleRepository
+from synthetic_data import best_of, write_dataset
+
+
+def main(n_samples, n_rows, points):
+    with tempfile.TemporaryDirectory() as folder:
+        write_dataset(folder, n_samples, n_rows, compression="zstd")
+        start = time.perf_counter()
+        build_pyramid(folder, [1, 10, 60])
+        print(f"{n_samples} samples x {n_rows} rows, pyramid written in {time.perf_counter() - start:.1f} s")
+
+        repo = SampleRepository(folder, cache_max_bytes=0)
+        ids = list(repo.metadata["id"])
+        level = repo.pyramid_level(points=points)
+        print(f"level for {points} points: {level if level is not None else 'full'}")
+
+        print(f"{'level':<6} {'select ms':>10} {'scan ms':>9} {'rows':>10} {'MB read':>8}")
+        for level_s in (None, level):
+            select_s, _ = best_of(lambda: repo.select(points=points) if level_s is not None else repo.select())
+            scan_s, df = best_of(lambda: repo.scan(level_s=level_s).select("id", "t_s", "dm_mg").collect())
+            size = sum(os.path.getsize(pyramid_path(folder, i, level_s, LAYOUT_FILES)) for i in ids)
+            name = f"{level_s:g}s" if level_s is not None else "full"
+            print(f"{name:<6} {select_s * 1000:>10.1f} {scan_s * 1000:>9.1f} {df.height:>10} {size / 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [200, 100_000, 2000][len(args):]))
@@ -0,0 +1,91 @@
+"""
+Helpers to generate synthetic TGA exports and to time them for the benchmark scripts in this folder.
+The generated files mimic the layout of the instrument TXT exports: a block of '#'
+header lines, followed by a comma separated data block.
+"""
+import math
+import random
+import time
+
+
+HEADER_COLUMNS = [
+    "Time(s)",
+    "Temperature(°C)",
+    "Corrected delta m(mg)",
+    "Gas 1(sccm/min)",
+    "Gas 2(sccm/min)",
+    "Purge(sccm/min)",
+    "DTA_RAW(1)",
+    "POWER(%)",
+]
+
+
+def best_of(func, repeat=3):
+    """Runs func repeat times and returns the shortest time in seconds and the result of the last run."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def write_tga_export(path, n_rows, name="RT1", time_step_s=0.1, seed=0):
+    """
+    Write a synthetic TGA export with n_rows data rows to path.
+
+    The temperature ramps linearly, the mass shows a sigmoid step around 600 °C,
+    gas flows are integers during the purge phase, like in real exports.
+    """
+    rng = random.Random(seed)
+    with open(path, "w", encoding="cp1252", newline="\r\n") as file:
+        file.write("# Export date and time: Mo Mrz 3 10:11:12 2025\n")
+        file.write("# Measurement date and time: Fr Feb 28 09:00:01 2025\n")
+        file.write(f"# Name: {name}\n")
+        file.write("# Weight: 25.31 mg\n")
+        file.write(",".join(HEADER_COLUMNS) + "\n")
+
+        for i in range(n_rows):
+            t = i * time_step_s
+            temperature = 25.0 + t * 10.0 / 60.0
+            dm = -5.0 / (1.0 + math.exp(-(temperature - 600.0) / 15.0)) + rng.gauss(0, 0.002)
+            gas1 = 0 if t < 600 else 100.0 + rng.gauss(0, 0.1)
+            file.write(f"{t:.3f},{temperature:.4f},{dm:.6f},{gas1},0,50,{rng.random():.5f},"
+                       f"{50 + 10 * math.sin(t / 30):.3f}\n")
+
+
+def make_sample_frame(n_rows, time_step_s=1.0, seed=0):
+    """Synthetic sample data with the column names used in the dataset (t_s, T_C, dm_mg, ...)."""
+    import numpy as np
+    import polars as pl
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_rows) * time_step_s
+    temperature = 25.0 + t * 10.0 / 60.0
+    dm = -5.0 / (1.0 + np.exp(-(temperature - 600.0 - rng.normal(0, 20)) / 15.0)) + rng.normal(0, 0.002, n_rows)
+    return pl.DataFrame({
+        "t_s": t,
+        "T_C": temperature,
+        "dm_mg": dm,
+        "gas1_l_min": np.where(t < 600, 0.0, 100.0),
+        "purge_l_min": np.full(n_rows, 50.0),
+        "DTA1": rng.random(n_rows),
+    })
+
+
+def write_dataset(folder, n_samples, n_rows, compression="gzip"):
+    """Write a dataset folder in the sample_{id}.parquet layout with a matching metadata.parquet."""
+    import os
+    import polars as pl
+
+    os.makedirs(folder, exist_ok=True)
+    rows = []
+    for i in range(n_samples):
+        sample_id = f"RT{i}"
+        make_sample_frame(n_rows, seed=i).write_parquet(os.path.join(folder, f"sample_{sample_id}.parquet"),
+                                                        compression=compression)
+        rows.append({"id": sample_id,
+                     "Sample": f"EAFD{i % 10}",
+                     "Sample Condition": "Washed" if i % 2 == 0 else "Raw"})
+    pl.DataFrame(rows).write_parquet(os.path.join(folder, "metadata.parquet"))
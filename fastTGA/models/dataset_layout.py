@@ -0,0 +1,420 @@
+import json
+import operator
+import os
+import shutil
+from functools import reduce
+
+import polars as pl
+
+from fastTGA.models import metadata_log
+from fastTGA.models.downsampling import DOWNSAMPLERS, make_downsampler
+
+
+# One sample_{id}.parquet file per sample next to metadata.parquet
+LAYOUT_FILES = "files"
+# One hive partitioned parquet dataset: samples/id={id}/data.parquet
+LAYOUT_HIVE = "hive"
+
+SAMPLES_DIRECTORY = "samples"
+
+# Storage formats of the sample files: parquet, or Arrow IPC (Feather v2) files that are read memory mapped
+FORMAT_PARQUET = "parquet"
+FORMAT_IPC = "ipc"
+SAMPLE_EXTENSIONS = {FORMAT_PARQUET: ".parquet", FORMAT_IPC: ".arrow"}
+
+# Dataset wide settings, e.g. the parquet write options of the sample files
+DATASET_INFO_FILE = "dataset.json"
+
+PARQUET_CODECS = {"zstd", "lz4", "snappy", "gzip", "brotli", "uncompressed"}
+
+DEFAULT_PARQUET_OPTIONS = {
+    "compression": "zstd",
+    "compression_level": None,
+    # several row groups per sample, so that t_s / T_C windows can skip row groups using their statistics
+    "row_group_size": 16_384,
+    "statistics": True,
+}
+
+
+IPC_CODECS = {"uncompressed", "lz4", "zstd"}
+
+# Uncompressed files are used zero-copy, compressed ones have to be decompressed into memory on every read
+DEFAULT_IPC_OPTIONS = {
+    "compression": "uncompressed",
+}
+
+# Optional downsampled copies of every sample for overview queries, one directory per level:
+# pyramid/{level}s/ with the same file layout as the full resolution sample files
+PYRAMID_DIRECTORY = "pyramid"
+
+# Levels in seconds per row. The min/max envelope keeps peaks visible at every level.
+DEFAULT_PYRAMID_OPTIONS = {
+    "levels": [1, 10, 60],
+    "method": "envelope",
+}
+
+
+def validate_parquet_options(options: dict) -> dict:
+    """Returns the complete parquet write options, raises ValueError on unknown keys or codecs."""
+    unknown = set(options) - set(DEFAULT_PARQUET_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unsupported parquet options: {sorted(unknown)}")
+    merged = {**DEFAULT_PARQUET_OPTIONS, **options}
+    if merged["compression"] not in PARQUET_CODECS:
+        raise ValueError(f"Unsupported compression: {merged['compression']}")
+    return merged
+
+
+def validate_ipc_options(options: dict) -> dict:
+    """Returns the complete Arrow IPC write options, raises ValueError on unknown keys or codecs."""
+    unknown = set(options) - set(DEFAULT_IPC_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unsupported IPC options: {sorted(unknown)}")
+    merged = {**DEFAULT_IPC_OPTIONS, **options}
+    if merged["compression"] not in IPC_CODECS:
+        raise ValueError(f"Unsupported compression: {merged['compression']}")
+    return merged
+
+
+def validate_pyramid_options(options: dict) -> dict:
+    """Returns the complete pyramid options with the levels sorted, raises ValueError on invalid ones."""
+    unknown = set(options) - set(DEFAULT_PYRAMID_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unsupported pyramid options: {sorted(unknown)}")
+    merged = {**DEFAULT_PYRAMID_OPTIONS, **options}
+    if merged["method"] not in DOWNSAMPLERS:
+        raise ValueError(f"Unsupported downsampling method: {merged['method']}")
+    if not merged["levels"] or any(level <= 0 for level in merged["levels"]):
+        raise ValueError(f"Pyramid levels must be positive, got {merged['levels']}")
+    merged["levels"] = sorted(set(merged["levels"]))
+    return merged
+
+
+def read_dataset_info(folder_path: str) -> dict:
+    """Returns the content of dataset.json, or an empty dict for datasets without one."""
+    info_file = os.path.join(folder_path, DATASET_INFO_FILE)
+    if not os.path.exists(info_file):
+        return {}
+    with open(info_file, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def write_dataset_info(folder_path: str, info: dict):
+    with open(os.path.join(folder_path, DATASET_INFO_FILE), "w", encoding="utf-8") as file:
+        json.dump(info, file, indent=2)
+
+
+def detect_layout(folder_path: str) -> str | None:
+    """
+    Returns the storage layout of a dataset folder, or None if the folder contains no sample data yet.
+    """
+    if os.path.isdir(os.path.join(folder_path, SAMPLES_DIRECTORY)):
+        return LAYOUT_HIVE
+    if os.path.isdir(folder_path):
+        for filename in os.listdir(folder_path):
+            if filename.startswith("sample_") and filename.endswith(tuple(SAMPLE_EXTENSIONS.values())):
+                return LAYOUT_FILES
+    return None
+
+
+def detect_storage_format(folder_path: str) -> str:
+    """Returns the storage format of the sample files recorded in dataset.json, parquet if there is none."""
+    return read_dataset_info(folder_path).get("format", FORMAT_PARQUET)
+
+
+def sample_file(sample_id: str, layout: str, storage_format: str = FORMAT_PARQUET) -> str:
+    """Path of the sample data file relative to the dataset folder."""
+    extension = SAMPLE_EXTENSIONS[storage_format]
+    if layout == LAYOUT_HIVE:
+        return os.path.join(SAMPLES_DIRECTORY, f"id={sample_id}", f"data{extension}")
+    return f"sample_{sample_id}{extension}"
+
+
+def sample_path(folder_path: str, sample_id: str, layout: str, storage_format: str = FORMAT_PARQUET) -> str:
+    return os.path.join(folder_path, sample_file(sample_id, layout, storage_format))
+
+
+def pyramid_directory(folder_path: str, level_s: float) -> str:
+    return os.path.join(folder_path, PYRAMID_DIRECTORY, f"{level_s:g}s")
+
+
+def pyramid_path(folder_path: str, sample_id: str, level_s: float | None, layout: str,
+                 storage_format: str = FORMAT_PARQUET) -> str:
+    """Path of a pyramid level of a sample, level_s None is the full resolution sample file."""
+    if level_s is None:
+        return sample_path(folder_path, sample_id, layout, storage_format)
+    return sample_path(pyramid_directory(folder_path, level_s), sample_id, layout, storage_format)
+
+
+def write_pyramid(df: pl.DataFrame, folder_path: str, sample_id: str, layout: str, pyramid: dict,
+                  storage_format: str = FORMAT_PARQUET, options: dict | None = None):
+    """Write all pyramid levels of a sample, df is the full resolution data sorted by time."""
+    for level_s in pyramid["levels"]:
+        path = pyramid_path(folder_path, sample_id, level_s, layout, storage_format)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_sample(make_downsampler(pyramid["method"], level_s).apply(df), path + ".tmp", storage_format, options)
+        os.replace(path + ".tmp", path)
+
+
+def count_rows(path: str, predicate: pl.Expr | None = None) -> int:
+    """Rows of a sample file, without a predicate only the file footer is read."""
+    lf = scan_sample(path)
+    if predicate is not None:
+        lf = lf.filter(predicate)
+    return lf.select(pl.len()).collect().item()
+
+
+def write_sample(df: pl.DataFrame, path: str, storage_format: str = FORMAT_PARQUET, options: dict | None = None):
+    """Write a sample file with the parquet or IPC write options of the dataset."""
+    if storage_format == FORMAT_IPC:
+        df.write_ipc(path, **validate_ipc_options(options or {}))
+    else:
+        df.write_parquet(path, **validate_parquet_options(options or {}))
+
+
+def range_predicate(t_range: tuple | None = None, T_range: tuple | None = None) -> pl.Expr | None:
+    """
+    Row filter for a time window on t_s and/or a temperature window on T_C, given as (start, end) with
+    inclusive bounds, either of which may be None. Returns None if no window is given.
+    """
+    conditions = []
+    for column, bounds in (("t_s", t_range), ("T_C", T_range)):
+        if bounds is None:
+            continue
+        start, end = bounds
+        if start is not None:
+            conditions.append(pl.col(column) >= start)
+        if end is not None:
+            conditions.append(pl.col(column) <= end)
+    return reduce(operator.and_, conditions) if conditions else None
+
+
+def read_sample(path: str, columns: list[str] | None = None, predicate: pl.Expr | None = None) -> pl.DataFrame:
+    """
+    Read a sample file. Only the given columns are read, and row groups whose statistics exclude
+    the predicate are skipped. Arrow IPC files are memory mapped, see read_ipc_mapped.
+    """
+    if path.endswith(SAMPLE_EXTENSIONS[FORMAT_IPC]):
+        if columns is None and predicate is None:
+            return read_ipc_mapped(path)
+        lf = read_ipc_mapped(path).lazy()
+    elif columns is None and predicate is None:
+        return pl.read_parquet(path)
+    else:
+        lf = pl.scan_parquet(path, hive_partitioning=False)
+    if predicate is not None:
+        lf = lf.filter(predicate)
+    if columns is not None:
+        lf = lf.select(columns)
+    return lf.collect()
+
+
+def read_ipc_mapped(path: str) -> pl.DataFrame:
+    """
+    Memory map an Arrow IPC file. The columns of uncompressed files point into the mapping, so
+    processes reading the same file share its pages through the OS cache instead of holding copies.
+    Memory mapping needs pyarrow, without it the file is read into memory by polars.
+
+    Note that on Windows a file cannot be replaced while a process has it mapped.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return pl.read_ipc(path)
+    return pl.from_arrow(pa.ipc.open_file(pa.memory_map(path)).read_all())
+
+
+def scan_sample(path: str) -> pl.LazyFrame:
+    """Lazily scan a sample file of either storage format."""
+    if path.endswith(SAMPLE_EXTENSIONS[FORMAT_IPC]):
+        return pl.scan_ipc(path)
+    return pl.scan_parquet(path, hive_partitioning=False)
+
+
+def scan_hive_dataset(folder_path: str, storage_format: str = FORMAT_PARQUET) -> pl.LazyFrame:
+    """
+    Scans the consolidated dataset. The 'id' column comes from the partition directories, so filters on id
+    prune whole partitions and filters on data columns are pushed down into the parquet reader.
+    """
+    source = os.path.join(folder_path, SAMPLES_DIRECTORY, "**", f"*{SAMPLE_EXTENSIONS[storage_format]}")
+    if storage_format == FORMAT_IPC:
+        return pl.scan_ipc(source, hive_partitioning=True, hive_schema={"id": pl.Utf8})
+    return pl.scan_parquet(source, hive_partitioning=True, hive_schema={"id": pl.Utf8})
+
+
+def migrate_to_hive(folder_path: str, remove_old: bool = False) -> int:
+    """
+    Moves a dataset folder from the sample_{id}.parquet layout to the consolidated hive layout.
+    The files are copied as they are, and the output_file column of the import manifest is updated.
+
+    Args:
+        folder_path (str): The dataset folder containing metadata.parquet.
+        remove_old (bool, optional): Delete the sample_{id}.parquet files after copying. Defaults to False.
+
+    Returns:
+        int: Number of migrated samples.
+    """
+    metadata = metadata_log.read_table(folder_path, "metadata")
+    storage_format = detect_storage_format(folder_path)
+    migrated = 0
+
+    for sample_id in metadata["id"]:
+        source = sample_path(folder_path, sample_id, LAYOUT_FILES, storage_format)
+        if not os.path.exists(source):
+            print(f"Warning: Sample file for id '{sample_id}' not found. Skipping.")
+            continue
+
+        target = sample_path(folder_path, sample_id, LAYOUT_HIVE, storage_format)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(source, target)
+        migrated += 1
+
+    _update_manifest_output_files(folder_path, LAYOUT_HIVE, storage_format)
+    if "pyramid" in read_dataset_info(folder_path):
+        build_pyramid(folder_path)
+
+    if remove_old:
+        for sample_id in metadata["id"]:
+            source = sample_path(folder_path, sample_id, LAYOUT_FILES, storage_format)
+            if os.path.exists(source):
+                os.remove(source)
+
+    return migrated
+
+
+def convert_format(folder_path: str, storage_format: str, **options) -> int:
+    """
+    Rewrites the sample files of a dataset folder in another storage format, or with other write options.
+    The format and its options are recorded in dataset.json, and the output_file column of the import
+    manifest is updated.
+
+    Args:
+        folder_path (str): The dataset folder containing metadata.parquet.
+        storage_format (str): FORMAT_PARQUET or FORMAT_IPC.
+        **options: The parquet or IPC write options, e.g. compression="lz4".
+
+    Returns:
+        int: Number of converted samples.
+    """
+    if storage_format not in SAMPLE_EXTENSIONS:
+        raise ValueError(f"Unsupported storage format: {storage_format}")
+
+    info = read_dataset_info(folder_path)
+    if storage_format == FORMAT_IPC:
+        options = validate_ipc_options(options)
+    else:
+        options = validate_parquet_options({**info.get("parquet", {}), **options})
+
+    current_format = info.get("format", FORMAT_PARQUET)
+    layout = detect_layout(folder_path) or LAYOUT_FILES
+    metadata = metadata_log.read_table(folder_path, "metadata")
+    converted = 0
+
+    for sample_id in metadata["id"]:
+        source = sample_path(folder_path, sample_id, layout, current_format)
+        if not os.path.exists(source):
+            print(f"Warning: Sample file for id '{sample_id}' not found. Skipping.")
+            continue
+
+        # read into memory instead of mapping, the source may be replaced by the converted file
+        target = sample_path(folder_path, sample_id, layout, storage_format)
+        write_sample(scan_sample(source).collect(), target + ".tmp", storage_format, options)
+        os.replace(target + ".tmp", target)
+        if source != target:
+            os.remove(source)
+        converted += 1
+
+    info["format"] = storage_format
+    info[storage_format] = options
+    write_dataset_info(folder_path, info)
+    _update_manifest_output_files(folder_path, layout, storage_format)
+    if "pyramid" in info:
+        build_pyramid(folder_path)
+    return converted
+
+
+def build_pyramid(folder_path: str, levels: list[float] | None = None, method: str | None = None) -> int:
+    """
+    Writes the pyramid levels of all samples of a dataset folder and records them in dataset.json, so that
+    TGADatasetModel keeps them up to date on import. Existing levels are removed first. Without levels the
+    pyramid options of dataset.json are used, levels=[] removes the pyramid.
+
+    Args:
+        folder_path (str): The dataset folder containing metadata.parquet.
+        levels (list[float], optional): Seconds per row of every level, e.g. [1, 10, 60].
+        method (str, optional): Downsampling method of the levels, see fastTGA.models.downsampling.
+
+    Returns:
+        int: Number of samples written.
+    """
+    info = read_dataset_info(folder_path)
+    shutil.rmtree(os.path.join(folder_path, PYRAMID_DIRECTORY), ignore_errors=True)
+    if levels is not None and not levels:
+        info.pop("pyramid", None)
+        write_dataset_info(folder_path, info)
+        return 0
+
+    options = dict(info.get("pyramid", {}))
+    if levels is not None:
+        options["levels"] = levels
+    if method is not None:
+        options["method"] = method
+    pyramid = validate_pyramid_options(options)
+
+    storage_format = info.get("format", FORMAT_PARQUET)
+    write_options = info.get(storage_format, {})
+    layout = detect_layout(folder_path) or LAYOUT_FILES
+    metadata = metadata_log.read_table(folder_path, "metadata")
+    written = 0
+
+    # a new dataset has no metadata yet, its samples get their levels on import
+    for sample_id in metadata["id"] if "id" in metadata.columns else []:
+        source = sample_path(folder_path, sample_id, layout, storage_format)
+        if not os.path.exists(source):
+            print(f"Warning: Sample file for id '{sample_id}' not found. Skipping.")
+            continue
+        write_pyramid(scan_sample(source).collect(), folder_path, sample_id, layout, pyramid,
+                      storage_format, write_options)
+        written += 1
+
+    info["pyramid"] = pyramid
+    write_dataset_info(folder_path, info)
+    return written
+
+
+def _update_manifest_output_files(folder_path: str, layout: str, storage_format: str):
+    manifest_file = os.path.join(folder_path, "manifest.parquet")
+    metadata_log.compact_table(folder_path, "manifest")
+    if os.path.exists(manifest_file):
+        manifest = pl.read_parquet(manifest_file)
+        manifest = manifest.with_columns(
+            pl.col("id").map_elements(lambda i: sample_file(i, layout, storage_format), return_dtype=pl.Utf8)
+            .alias("output_file")
+        )
+        manifest.write_parquet(manifest_file)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m fastTGA.models.dataset_layout <dataset folder> [--remove-old]\n"
+              "       python -m fastTGA.models.dataset_layout <dataset folder> --format <parquet|ipc> [compression]\n"
+              "       python -m fastTGA.models.dataset_layout <dataset folder> --pyramid [level_s ...]")
+        sys.exit(1)
+
+    if "--pyramid" in sys.argv[2:]:
+        arguments = sys.argv[sys.argv.index("--pyramid") + 1:]
+        count = build_pyramid(sys.argv[1], [float(level) for level in arguments] or None)
+        print(f"Wrote the pyramid levels of {count} samples")
+        sys.exit(0)
+
+    if "--format" in sys.argv[2:]:
+        arguments = sys.argv[sys.argv.index("--format") + 1:]
+        compression = {"compression": arguments[1]} if len(arguments) > 1 else {}
+        count = convert_format(sys.argv[1], arguments[0], **compression)
+        print(f"Converted {count} samples to {arguments[0]}")
+        sys.exit(0)
+
+    count = migrate_to_hive(sys.argv[1], remove_old="--remove-old" in sys.argv[2:])
+    print(f"Migrated {count} samples to {os.path.join(sys.argv[1], SAMPLES_DIRECTORY)}")
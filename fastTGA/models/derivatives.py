@@ -0,0 +1,163 @@
+import polars as pl
+
+
+METHOD_CENTRAL = "central"
+METHOD_SAVGOL = "savgol"
+METHOD_REGRESSION = "regression"
+DERIVATIVE_METHODS = (METHOD_CENTRAL, METHOD_SAVGOL, METHOD_REGRESSION)
+
+# Column names of the derivatives of the mass against time and temperature, others are named d{y}_d{x}
+DEFAULT_ALIASES = {
+    ("dm_mg", "t_s"): "dmdt_mg_s",
+    ("dm_mg", "T_C"): "dmdT_mg_C",
+}
+
+
+def _ratio(numerator: pl.Expr, denominator: pl.Expr) -> pl.Expr:
+    """numerator / denominator, null instead of inf or NaN where the denominator is 0 (e.g. repeated t_s)."""
+    return pl.when(denominator != 0).then(numerator / denominator)
+
+
+def central_difference(y: str, x: str) -> pl.Expr:
+    """
+    dy/dx from the neighbouring rows, (y[i+1] - y[i-1]) / (x[i+1] - x[i-1]). The first and last row and rows
+    whose neighbours share the same x fall back to the forward or backward difference.
+    """
+    y, x = pl.col(y), pl.col(x)
+    return pl.coalesce(
+        _ratio(y.shift(-1) - y.shift(1), x.shift(-1) - x.shift(1)),
+        _ratio(y.shift(-1) - y, x.shift(-1) - x),
+        _ratio(y - y.shift(1), x - x.shift(1)),
+    )
+
+
+def savgol_coefficients(window: int, polyorder: int) -> list[float]:
+    """
+    Savitzky-Golay coefficients of the first derivative at the centre of an odd window, for unit row spacing.
+    They are the slope of the least squares polynomial of degree polyorder through the window.
+    """
+    half = window // 2
+    offsets = range(-half, half + 1)
+    size = polyorder + 1
+
+    # normal equations of the fit, solving M z = e1 gives the row of M^-1 belonging to the linear term
+    matrix = [[float(sum(k ** (i + j) for k in offsets)) for j in range(size)] + [1.0 if i == 1 else 0.0]
+              for i in range(size)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda row: abs(matrix[row][column]))
+        matrix[column], matrix[pivot] = matrix[pivot], matrix[column]
+        for row in range(size):
+            if row != column:
+                factor = matrix[row][column] / matrix[column][column]
+                matrix[row] = [a - factor * b for a, b in zip(matrix[row], matrix[column])]
+    z = [matrix[i][size] / matrix[i][i] for i in range(size)]
+    return [sum(z[j] * k ** j for j in range(size)) for k in offsets]
+
+
+def savitzky_golay(y: str, x: str, window: int = 11, polyorder: int = 2) -> pl.Expr:
+    """
+    dy/dx as the ratio of the Savitzky-Golay derivatives of y and x along the rows, (dy/di) / (dx/di).
+    Smoothing both columns with the same filter keeps the result correct for uneven or repeated time steps.
+    The half window at both ends, where the filter does not fit, uses the central difference.
+    """
+    coefficients = savgol_coefficients(window, polyorder)
+    half = window // 2
+
+    def along_rows(column: str) -> pl.Expr:
+        return pl.sum_horizontal([c * pl.col(column).shift(-k)
+                                  for k, c in zip(range(-half, half + 1), coefficients) if c != 0])
+
+    # sum_horizontal skips nulls, so rows near the ends must be masked explicitly
+    complete = pl.col(x).shift(-half).is_not_null() & pl.col(x).shift(half).is_not_null()
+    smoothed = pl.when(complete).then(_ratio(along_rows(y), along_rows(x)))
+    return pl.coalesce(smoothed, central_difference(y, x))
+
+
+def rolling_regression(y: str, x: str, window: int = 11) -> pl.Expr:
+    """
+    dy/dx as the slope of the least squares line of y over x through the rows of a centred window.
+    The window shrinks at both ends. x and y are taken relative to the centre row, which keeps the sums
+    well conditioned for large time values.
+    """
+    half = window // 2
+    dxs, dys = [], []
+    for k in range(-half, half + 1):
+        dx = pl.col(x).shift(-k) - pl.col(x)
+        dy = pl.col(y).shift(-k) - pl.col(y)
+        valid = dx.is_not_null() & dy.is_not_null()
+        dxs.append(pl.when(valid).then(dx))
+        dys.append(pl.when(valid).then(dy))
+
+    n = pl.sum_horizontal([dx.is_not_null().cast(pl.Float64) for dx in dxs])
+    sx, sy = pl.sum_horizontal(dxs), pl.sum_horizontal(dys)
+    sxx = pl.sum_horizontal([dx * dx for dx in dxs])
+    sxy = pl.sum_horizontal([dx * dy for dx, dy in zip(dxs, dys)])
+    return _ratio(n * sxy - sx * sy, n * sxx - sx * sx)
+
+
+class Derivative:
+    def __init__(self, y: str = "dm_mg", x: str = "t_s", method: str = METHOD_CENTRAL, window: int = 11,
+                 polyorder: int = 2, alias: str = None):
+        """
+        Vectorized derivative dy/dx of two sample columns, e.g. the DTG curve dm/dt or dm/dT:
+
+            df = Derivative(method="savgol", window=21).apply(df)         # adds dmdt_mg_s
+            lf = Derivative(x="T_C").apply(lf, group="id")               # dm/dT of every sample in a scan
+
+        The rows must be in measurement order (sorted by time). x does not have to be monotonic, so derivatives
+        against the temperature work through isothermal segments. Where x does not change the result is null,
+        never inf or NaN.
+
+        Args:
+            y (str, optional): The column to differentiate. Defaults to "dm_mg".
+            x (str, optional): The column to differentiate against. Defaults to "t_s".
+            method (str, optional): "central" (central difference, no smoothing), "savgol" (Savitzky-Golay
+                filter) or "regression" (slope of a rolling linear fit). Defaults to "central".
+            window (int, optional): Rows per window of "savgol" and "regression", odd. Defaults to 11.
+            polyorder (int, optional): Degree of the "savgol" polynomial, smaller than window. Defaults to 2.
+            alias (str, optional): Name of the result column. Defaults to DEFAULT_ALIASES or d{y}_d{x}.
+        """
+        if method not in DERIVATIVE_METHODS:
+            raise ValueError(f"Unsupported derivative method: {method}")
+        if method != METHOD_CENTRAL and (window < 3 or window % 2 == 0):
+            raise ValueError(f"Derivative window must be odd and at least 3, got {window}")
+        if method == METHOD_SAVGOL and not 1 <= polyorder < window:
+            raise ValueError(f"Savitzky-Golay polyorder must be between 1 and window - 1, got {polyorder}")
+
+        self.y = y
+        self.x = x
+        self.method = method
+        self.window = window
+        self.polyorder = polyorder
+        self.alias = alias or DEFAULT_ALIASES.get((y, x), f"d{y}_d{x}")
+
+    def expr(self, group: str | None = None) -> pl.Expr:
+        """
+        The derivative as an expression named self.alias. With a group column it is evaluated per sample
+        (.over(group)), so a concatenated multi-sample frame is differentiated in one pass.
+        """
+        if self.method == METHOD_SAVGOL:
+            expr = savitzky_golay(self.y, self.x, self.window, self.polyorder)
+        elif self.method == METHOD_REGRESSION:
+            expr = rolling_regression(self.y, self.x, self.window)
+        else:
+            expr = central_difference(self.y, self.x)
+        if group is not None:
+            expr = expr.over(group)
+        return expr.alias(self.alias)
+
+    def apply(self, df: pl.DataFrame | pl.LazyFrame, group: str | None = None) -> pl.DataFrame | pl.LazyFrame:
+        """Adds the derivative column to df, see expr."""
+        return df.with_columns(self.expr(group))
+
+    def config(self) -> str:
+        """Identifies the derivative and its parameters, e.g. for the import manifest."""
+        parameters = ""
+        if self.method != METHOD_CENTRAL:
+            parameters = f", window={self.window}"
+        if self.method == METHOD_SAVGOL:
+            parameters += f", polyorder={self.polyorder}"
+        return f"{self.alias}={self.method}(d{self.y}/d{self.x}{parameters})"
+
+    def __repr__(self) -> str:
+        return f"Derivative({self.config()})"
@@ -0,0 +1,198 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+import polars as pl
+
+
+def _per_sample(expr: pl.Expr, group: str | None) -> pl.Expr:
+    return expr.over(group) if group is not None else expr
+
+
+def _filter_windows(df: pl.DataFrame | pl.LazyFrame, time_column: str, every_s: float, group: str | None,
+                    windows, keep: pl.Expr) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Aggregates the rows per every_s window with windows(rows, keys), joins the result back to the rows and keeps
+    the rows matching keep, together with the first and the last row of every sample. rows has the additional
+    columns '_row' (row number in df) and '_window', which keep may use as well as the aggregated columns.
+    One group_by is much faster than window expressions (.over) for the many small windows of a sample.
+    """
+    keys = [group, "_window"] if group is not None else ["_window"]
+    rows = df.with_row_index("_row").with_columns((pl.col(time_column) // every_s).cast(pl.Int64).alias("_window"))
+    row = pl.col("_row")
+    ends = (row == _per_sample(row.min(), group)) | (row == _per_sample(row.max(), group))
+    return (rows.join(windows(rows, keys), on=keys, how="left", maintain_order="left")
+            .filter(keep | ends)
+            .select(df.collect_schema().names()))
+
+
+class Downsampler(ABC):
+    # Name of the method in DOWNSAMPLERS and in the preprocessing config
+    method: str = ""
+
+    def __init__(self, every_s: float, time_column: str = "t_s"):
+        if every_s <= 0:
+            raise ValueError(f"Downsampling interval must be positive, got {every_s}")
+        self.every_s = float(every_s)
+        self.time_column = time_column
+
+    @abstractmethod
+    def apply(self, df: pl.DataFrame | pl.LazyFrame, group: str | None = None) -> pl.DataFrame | pl.LazyFrame:
+        """
+        Reduce the rows of df, sorted by time. With a group column every sample of a concatenated multi-sample
+        frame is downsampled on its own.
+        """
+
+    def config(self) -> str:
+        """Identifies the method and its parameters, e.g. for the import manifest."""
+        parameters = ", ".join(f"{key}={value}" for key, value in vars(self).items() if key != "time_column")
+        return f"{self.method}({parameters})"
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.config()})"
+
+
+class MeanDownsampler(Downsampler):
+    method = "mean"
+
+    def apply(self, df, group=None):
+        """
+        One row per every_s window holding the mean of every column, labelled with the start of the window.
+        Smooths noise, but also flattens peaks and steps narrower than the window.
+        """
+        # group_by_dynamic needs an integer index, time is bucketed in milliseconds
+        every_ms = int(round(self.every_s * 1000))
+        df = df.with_columns((pl.col(self.time_column) * 1000).cast(pl.Int64))
+        df = df.group_by_dynamic(self.time_column, every=f"{every_ms}i", group_by=group).agg(pl.all().mean())
+        return df.with_columns((pl.col(self.time_column) / 1000).cast(pl.Float64))
+
+
+class EnvelopeDownsampler(Downsampler):
+    method = "envelope"
+
+    def __init__(self, every_s: float, columns: list[str] | tuple[str, ...] = ("dm_mg",), time_column: str = "t_s"):
+        """Keeps the original rows holding the minimum and the maximum of columns in every every_s window."""
+        super().__init__(every_s, time_column)
+        self.columns = list(columns)
+
+    def apply(self, df, group=None):
+        """
+        Up to 2 rows per column and every_s window, plus the first and last row. The rows are not averaged,
+        so peak heights and step edges are kept exactly.
+        """
+        # the rows of a window are consecutive, so its first row plus arg_min / arg_max is the row number
+        extremes, keep = [pl.col("_row").first().alias("_first")], pl.lit(False)
+        for i, column in enumerate(self.columns):
+            extremes += [pl.col(column).arg_min().alias(f"_min{i}"), pl.col(column).arg_max().alias(f"_max{i}")]
+            offset = pl.col("_row") - pl.col("_first")
+            keep = keep | (offset == pl.col(f"_min{i}")) | (offset == pl.col(f"_max{i}"))
+        return _filter_windows(df, self.time_column, self.every_s, group,
+                               lambda rows, keys: rows.group_by(keys).agg(extremes), keep)
+
+
+class LTTBDownsampler(Downsampler):
+    method = "lttb"
+
+    def __init__(self, every_s: float, column: str = "dm_mg", time_column: str = "t_s"):
+        """
+        Largest-triangle-three-buckets: keeps about one original row per every_s, in every bucket the one
+        spanning the largest triangle with the previously kept row and the mean of the next bucket.
+        """
+        super().__init__(every_s, time_column)
+        self.column = column
+
+    @staticmethod
+    def indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+        """Rows selected by LTTB out of the points (x, y), always including the first and the last one."""
+        n = len(x)
+        if n_out >= n or n_out < 3:
+            return np.arange(n)
+
+        # n_out - 2 buckets between the first and the last point, which are always kept
+        edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+        counts = np.diff(edges)
+        x_means = np.append(np.add.reduceat(x[:-1], edges[:-1]) / counts, x[-1])
+        y_means = np.append(np.add.reduceat(y[:-1], edges[:-1]) / counts, y[-1])
+
+        selected = np.empty(n_out, dtype=np.int64)
+        selected[0], selected[-1] = 0, n - 1
+        a = 0
+        for bucket in range(n_out - 2):
+            start, end = edges[bucket], edges[bucket + 1]
+            xc, yc = x_means[bucket + 1], y_means[bucket + 1]
+            area = np.abs((x[a] - xc) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (yc - y[a]))
+            a = start + int(np.argmax(area))
+            selected[bucket + 1] = a
+        return selected
+
+    def _apply_frame(self, df: pl.DataFrame) -> pl.DataFrame:
+        if df.height < 3:
+            return df
+        x = df[self.time_column].to_numpy()
+        y = df[self.column].interpolate().fill_null(strategy="forward").fill_null(strategy="backward").to_numpy()
+        n_out = int((x[-1] - x[0]) / self.every_s) + 1
+        return df[self.indices(x, y, n_out)]
+
+    def apply(self, df, group=None):
+        """The point selection itself is a loop over the buckets, the area of all points in a bucket is vectorized."""
+        if isinstance(df, pl.LazyFrame):
+            return df.map_batches(lambda frame: self.apply(frame, group), streamable=False)
+        if group is None:
+            return self._apply_frame(df)
+        samples = df.partition_by(group, maintain_order=True)
+        return pl.concat([self._apply_frame(sample) for sample in samples]) if samples else df
+
+
+class AdaptiveDownsampler(Downsampler):
+    method = "adaptive"
+
+    def __init__(self, every_s: float, column: str = "dm_mg", tolerance: float = 0.01, time_column: str = "t_s"):
+        """
+        Change driven: every every_s window keeps 1 + change / tolerance evenly spaced original rows, where change
+        is how much column changes across the window. Flat segments keep one row per window, fast mass loss
+        keeps up to the full resolution.
+        """
+        super().__init__(every_s, time_column)
+        self.column = column
+        self.tolerance = tolerance
+
+    def apply(self, df, group=None):
+        """
+        The change is estimated as twice the difference of the means of column in the two halves of the window,
+        which averages out noise that a min/max range or a row to row difference would count as change.
+        """
+        def windows(rows, keys):
+            second_half = ((pl.col(self.time_column) / (self.every_s / 2)).floor() % 2).cast(pl.Int8)
+            halves = (rows.group_by([*keys, second_half.alias("_half")])
+                      .agg(pl.col(self.column).mean().alias("_mean"), pl.col("_row").min().alias("_first"),
+                           pl.len().alias("_rows")))
+            signed_mean = pl.col("_mean") * (2 * pl.col("_half") - 1)
+            change = pl.when(pl.len() == 2).then(2 * signed_mean.sum().abs())
+            kept_rows = (1 + (change / self.tolerance).ceil()).fill_null(1)
+            return halves.group_by(keys).agg(
+                pl.col("_first").min(),
+                (pl.col("_rows").sum() // kept_rows).clip(lower_bound=1).cast(pl.Int64).alias("_stride"))
+
+        keep = (pl.col("_row") - pl.col("_first")) % pl.col("_stride") == 0
+        return _filter_windows(df, self.time_column, self.every_s, group, windows, keep)
+
+
+DOWNSAMPLERS = {
+    MeanDownsampler.method: MeanDownsampler,
+    EnvelopeDownsampler.method: EnvelopeDownsampler,
+    LTTBDownsampler.method: LTTBDownsampler,
+    AdaptiveDownsampler.method: AdaptiveDownsampler,
+}
+
+
+def make_downsampler(method: str, every_s: float, **options) -> Downsampler:
+    """
+    Create a downsampler by name, e.g. make_downsampler("lttb", 5.0).
+
+    Args:
+        method (str): "mean", "envelope", "lttb" or "adaptive".
+        every_s (float): Window length in seconds, see the Downsampler classes.
+        **options: Further parameters of the class, e.g. tolerance of "adaptive".
+    """
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"Unsupported downsampling method: {method}")
+    return DOWNSAMPLERS[method](every_s, **options)
@@ -0,0 +1,51 @@
+from typing import Iterable
+
+import polars as pl
+
+
+class IdIndex:
+    def __init__(self, ids: pl.Series | None = None):
+        """
+        Maps sample ids to their row in a metadata DataFrame, so single lookups don't scan the whole 'id' column.
+        Ids are stored as strings. The owner of the DataFrame keeps the index up to date, either with add
+        for appended rows or with rebuild whenever rows are removed or reordered.
+
+        Args:
+            ids (pl.Series, optional): The 'id' column to index.
+        """
+        self._rows: dict[str, int] = {}
+        if ids is not None:
+            self.rebuild(ids)
+
+    def rebuild(self, ids: pl.Series):
+        """Index the given 'id' column from scratch."""
+        self._rows = {str(sample_id): row for row, sample_id in enumerate(ids.to_list())}
+
+    def clear(self):
+        self._rows = {}
+
+    def add(self, sample_id, row: int):
+        """Register a row appended to the indexed DataFrame."""
+        self._rows[str(sample_id)] = row
+
+    def row(self, sample_id) -> int | None:
+        """Row of sample_id, or None if the id is not indexed."""
+        return self._rows.get(str(sample_id))
+
+    def rows(self, sample_ids: Iterable) -> list[int]:
+        """Rows of sample_ids in the requested order, ids that are not indexed are skipped."""
+        rows = (self._rows.get(str(sample_id)) for sample_id in sample_ids)
+        return [row for row in rows if row is not None]
+
+    def take(self, df: pl.DataFrame, sample_ids: Iterable) -> pl.DataFrame:
+        """
+        Returns the rows of the indexed DataFrame for sample_ids with a single gather, in the requested order.
+        Ids that are not indexed are skipped, so the result may be empty.
+        """
+        return df[self.rows(sample_ids)]
+
+    def __contains__(self, sample_id) -> bool:
+        return str(sample_id) in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
@@ -0,0 +1,116 @@
+import os
+import socket
+import time
+import uuid
+
+import polars as pl
+
+
+# Number of delta files after which TGADatasetModel starts a compaction in the background
+COMPACT_THRESHOLD = 64
+
+# A compaction lock older than this is considered left over from a crashed process
+STALE_LOCK_S = 10 * 60
+
+
+def base_file(folder_path: str, table: str) -> str:
+    """The base parquet file of a table, e.g. metadata.parquet."""
+    return os.path.join(folder_path, f"{table}.parquet")
+
+
+def delta_directory(folder_path: str, table: str) -> str:
+    return os.path.join(folder_path, f"{table}_deltas")
+
+
+def delta_files(folder_path: str, table: str) -> list[str]:
+    """The delta files of a table in the order they were written."""
+    directory = delta_directory(folder_path, table)
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, filename) for filename in sorted(os.listdir(directory))
+            if filename.endswith(".parquet")]
+
+
+def table_exists(folder_path: str, table: str) -> bool:
+    return os.path.exists(base_file(folder_path, table)) or bool(delta_files(folder_path, table))
+
+
+def append_delta(folder_path: str, table: str, rows: pl.DataFrame) -> str | None:
+    """
+    Write new or updated rows of a table to a new delta file. The file name starts with the time of writing,
+    followed by host and process, so that several computers can write to the same (synced) folder.
+
+    Returns:
+        str | None: The path of the delta file, or None if there were no rows.
+    """
+    if rows.is_empty():
+        return None
+    directory = delta_directory(folder_path, table)
+    os.makedirs(directory, exist_ok=True)
+    filename = f"{time.time_ns():020d}-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}.parquet"
+    path = os.path.join(directory, filename)
+
+    # write to a temporary file first so that readers never see half written deltas
+    rows.write_parquet(path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def _merge(base: str, deltas: list[str]) -> pl.DataFrame:
+    frames = [pl.read_parquet(base)] if os.path.exists(base) else []
+    frames += [pl.read_parquet(path) for path in deltas]
+    if not frames:
+        return pl.DataFrame()
+    merged = pl.concat(frames, how="diagonal_relaxed") if len(frames) > 1 else frames[0]
+    # last writer wins per id, updated rows move to the end like in TGADatasetModel.update_metadata
+    return merged.unique(subset="id", keep="last", maintain_order=True)
+
+
+def read_table(folder_path: str, table: str) -> pl.DataFrame:
+    """Read the base file of a table merged with all of its delta files."""
+    return _merge(base_file(folder_path, table), delta_files(folder_path, table))
+
+
+def compact_table(folder_path: str, table: str) -> int:
+    """
+    Fold the delta files of a table into its base file. Deltas written while compacting are kept for
+    the next compaction. Only one process compacts a table at a time, if another one holds the lock
+    nothing is done.
+
+    Returns:
+        int: Number of folded delta files.
+    """
+    lock_file = os.path.join(folder_path, f"{table}.compact.lock")
+    if not _acquire_lock(lock_file):
+        return 0
+
+    try:
+        deltas = delta_files(folder_path, table)
+        if not deltas:
+            return 0
+
+        base = base_file(folder_path, table)
+        merged = _merge(base, deltas)
+        merged.write_parquet(base + ".tmp")
+        os.replace(base + ".tmp", base)
+
+        # applying a delta twice gives the same result, so readers between replace and remove are fine
+        for path in deltas:
+            os.remove(path)
+        return len(deltas)
+    finally:
+        os.remove(lock_file)
+
+
+def _acquire_lock(lock_file: str) -> bool:
+    try:
+        os.close(os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return True
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(lock_file) < STALE_LOCK_S:
+                return False
+            os.remove(lock_file)
+        except FileNotFoundError:
+            pass
+        return _acquire_lock(lock_file)
@@ -1,14 +1,38 @@
+from fastTGA.models.dataset_layout import (LAYOUT_FILES, DEFAULT_PARQUET_OPTIONS, DEFAULT_IPC_OPTIONS, FORMAT_IPC,
+                                           FORMAT_PARQUET, detect_layout, detect_storage_format, sample_file,
+                                           sample_path, read_dataset_info, write_dataset_info,
+                                           validate_parquet_options, validate_ipc_options, range_predicate,
+                                           read_sample, scan_sample, write_sample, convert_format,
+                                           build_pyramid, write_pyramid)
 from fastTGA.models.google_spreadsheet_model import GoogleSpreadsheetModel
+from fastTGA.models.id_index import IdIndex
+from fastTGA.models import metadata_log
+from fastTGA.models.tga_entry_result import TGAEntryResult
 from fastTGA.models.tga_file import TGAFile
 from fastTGA.models.txt_directory_model import TXTDirectoryModel
 
 from PyQt6.QtCore import QObject, pyqtSignal, QSettings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import polars as pl
+import hashlib
 import os
+import threading
+
+
+def file_content_hash(path) -> str:
+    """BLAKE2b hash of the file content, used to detect changed source files."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
 class TGADatasetModel(QObject):
     message_signal = pyqtSignal(str)
+    entry_added = pyqtSignal(dict)  # metadata row of an added/updated entry
+    metadata_committed = pyqtSignal()  # metadata_table was replaced, e.g. at the end of a batch
 
     def __init__(self):
         super().__init__()
@@ -18,6 +42,38 @@ class TGADatasetModel(QObject):
         # Initialize data members
         self.metadata_file = None
         self.metadata_table = pl.DataFrame()
+        # id -> row of metadata_table, maintained by every method that changes metadata_table
+        self.id_index = IdIndex()
+
+        # Import manifest: per sample id the source file, its content hash and the preprocessing config
+        self.manifest_file = None
+        self.manifest = {}
+
+        # Rows collected by add_entry while a batch is open, keyed by sample id (last one wins)
+        self._batch_rows = None
+
+        # Layout used for new dataset folders, existing folders keep their layout (see dataset_layout)
+        self.default_storage_layout = self.settings.value('tga_dataset/storage_layout', LAYOUT_FILES)
+        self.storage_layout = self.default_storage_layout
+
+        # Storage format and write options of the sample files, recorded per dataset in dataset.json
+        self.storage_format = FORMAT_PARQUET
+        self.parquet_options = dict(DEFAULT_PARQUET_OPTIONS)
+        self.ipc_options = dict(DEFAULT_IPC_OPTIONS)
+
+        # Pyramid levels written next to every sample on import (see dataset_layout.build_pyramid),
+        # recorded per dataset in dataset.json. None writes no pyramid.
+        self.pyramid = None
+
+        # Append-only metadata storage (see metadata_log), recorded per dataset in dataset.json.
+        # Ids changed since the last save_metadata, only these rows are written in that mode.
+        self.metadata_log = False
+        self._unsaved_ids = set()
+        self._unsaved_manifest_ids = set()
+        self._compaction_thread = None
+
+        # (path_to_input, layout, format) detected for the input folder, see _input_sample_path
+        self._input_storage = None
 
         # Load last used directory from settings
         self.path_to_input = self.settings.value('tga_dataset/input_directory', '')
@@ -32,13 +88,38 @@ class TGADatasetModel(QObject):
             os.makedirs(self.path_to_output, exist_ok=True)
 
         self.metadata_file = os.path.join(self.path_to_output, "metadata.parquet")
-
-        if os.path.exists(self.metadata_file):
-            self.metadata_table = pl.read_parquet(self.metadata_file)
+        self._input_storage = None
+        self.storage_layout = detect_layout(self.path_to_output) or self.default_storage_layout
+        dataset_info = read_dataset_info(self.path_to_output)
+        self.storage_format = dataset_info.get("format", FORMAT_PARQUET)
+        self.parquet_options = validate_parquet_options(dataset_info.get("parquet", {}))
+        self.ipc_options = validate_ipc_options(dataset_info.get("ipc", {}))
+        self.metadata_log = dataset_info.get("metadata_log", False)
+        self.pyramid = dataset_info.get("pyramid")
+        self._unsaved_ids = set()
+        self._unsaved_manifest_ids = set()
+
+        # base files merged with the delta files of the append-only mode, if there are any
+        if metadata_log.table_exists(self.path_to_output, "metadata"):
+            self.metadata_table = metadata_log.read_table(self.path_to_output, "metadata")
+        self._rebuild_id_index()
+
+        self.manifest_file = os.path.join(self.path_to_output, "manifest.parquet")
+        self.manifest = {}
+        if metadata_log.table_exists(self.path_to_output, "manifest"):
+            manifest = metadata_log.read_table(self.path_to_output, "manifest")
+            self.manifest = {row["id"]: row for row in manifest.to_dicts()}
+
+    def _rebuild_id_index(self):
+        if self.metadata_table.is_empty():
+            self.id_index.clear()
+        else:
+            self.id_index.rebuild(self.metadata_table["id"])
 
     def set_input_path(self, path_to_directory):
         """Set new working directory and save to settings"""
         self.path_to_input = path_to_directory
+        self._input_storage = None
         self.settings.setValue('tga_dataset/input_directory', path_to_directory)
 
 
@@ -48,34 +129,301 @@ class TGADatasetModel(QObject):
         self.settings.setValue('tga_dataset/output_directory', path_to_directory)
         self._initialize_directory()
 
+    def set_storage_layout(self, layout):
+        """Set the layout for new dataset folders and save to settings"""
+        self.default_storage_layout = layout
+        self.settings.setValue('tga_dataset/storage_layout', layout)
+        if self.path_to_output and detect_layout(self.path_to_output) is None:
+            self.storage_layout = layout
+
+    def set_parquet_options(self, **options):
+        """
+        Set the parquet write options for the sample files of the current dataset, e.g.
+        set_parquet_options(compression="lz4") or set_parquet_options(compression="zstd", compression_level=3).
+        Supported options: compression, compression_level, row_group_size and statistics.
+        """
+        self.parquet_options = validate_parquet_options({**self.parquet_options, **options})
+        if self.path_to_output:
+            self._save_dataset_info()
+
+    def set_storage_format(self, storage_format, **options):
+        """
+        Set the storage format of the sample files of the current dataset and convert the existing ones:
+        FORMAT_PARQUET, or FORMAT_IPC for Arrow IPC files that are read memory mapped, which avoids the
+        decompression cost of parquet for interactive exploration, e.g. set_storage_format("ipc") or
+        set_storage_format("ipc", compression="lz4"). The options are the write options of the format.
+        """
+        if not self.path_to_output:
+            self.message_signal.emit("No directory set. Please set a directory first.")
+            return
+
+        self.save_metadata()
+        converted = convert_format(self.path_to_output, storage_format, **options)
+
+        dataset_info = read_dataset_info(self.path_to_output)
+        self.storage_format = storage_format
+        self._input_storage = None
+        self.parquet_options = validate_parquet_options(dataset_info.get("parquet", {}))
+        self.ipc_options = validate_ipc_options(dataset_info.get("ipc", {}))
+        for entry in self.manifest.values():
+            entry["output_file"] = sample_file(entry["id"], self.storage_layout, storage_format)
+        self.message_signal.emit(f"Converted {converted} samples to {storage_format}")
+
+    def set_pyramid(self, levels: list[float] | None, method: str | None = None):
+        """
+        Write downsampled copies of every sample of the current dataset for overview queries, e.g.
+        set_pyramid([1, 10, 60]) for levels with one row per 1, 10 and 60 seconds, see
+        SampleRepository.pyramid_level. New entries get their levels on import. set_pyramid(None) removes them.
+        """
+        if not self.path_to_output:
+            self.message_signal.emit("No directory set. Please set a directory first.")
+            return
+
+        self.save_metadata()
+        written = build_pyramid(self.path_to_output, levels if levels is not None else [], method)
+        self.pyramid = read_dataset_info(self.path_to_output).get("pyramid")
+        if self.pyramid:
+            self.message_signal.emit(f"Wrote the pyramid levels {self.pyramid['levels']} of {written} samples")
+
+    def set_metadata_log(self, enabled: bool):
+        """
+        Switch the current dataset to append-only metadata storage. Instead of rewriting metadata.parquet and
+        manifest.parquet, save_metadata then writes the changed rows to small delta files, which are folded
+        into the base files by compact_metadata. Switching it off compacts the pending deltas.
+        """
+        if self.metadata_log and not enabled and self.path_to_output:
+            self.save_metadata()
+            self.compact_metadata()
+        self.metadata_log = enabled
+        if self.path_to_output:
+            self._save_dataset_info()
+
+    def _save_dataset_info(self):
+        info = read_dataset_info(self.path_to_output)
+        info["layout"] = self.storage_layout
+        info["format"] = self.storage_format
+        info["parquet"] = self.parquet_options
+        info["ipc"] = self.ipc_options
+        info["metadata_log"] = self.metadata_log
+        if self.pyramid:
+            info["pyramid"] = self.pyramid
+        write_dataset_info(self.path_to_output, info)
+
     def save_metadata(self):
         """Write the current in-memory metadata table to disk."""
+        if self.metadata_log:
+            self._append_metadata_deltas()
+            return
+
         if not self.metadata_table.is_empty() and self.metadata_file:
             self.metadata_table.write_parquet(self.metadata_file)
+            self._save_dataset_info()
             self.message_signal.emit(f"Metadata saved to {self.metadata_file}")
+        if self.manifest and self.manifest_file:
+            pl.DataFrame(list(self.manifest.values()), schema=self._manifest_schema()).write_parquet(self.manifest_file)
+        self._unsaved_ids = set()
+        self._unsaved_manifest_ids = set()
+
+    def _append_metadata_deltas(self):
+        """save_metadata of the append-only mode, the cost only depends on the number of changed rows."""
+        if not self.path_to_output:
+            return
+
+        if self._unsaved_ids:
+            rows = self.id_index.take(self.metadata_table, sorted(self._unsaved_ids))
+            metadata_log.append_delta(self.path_to_output, "metadata", rows)
+            self.message_signal.emit(f"Metadata of {len(rows)} entries appended to {self.path_to_output}")
+        if self._unsaved_manifest_ids:
+            entries = [self.manifest[i] for i in sorted(self._unsaved_manifest_ids) if i in self.manifest]
+            metadata_log.append_delta(self.path_to_output, "manifest",
+                                      pl.DataFrame(entries, schema=self._manifest_schema()))
+        self._unsaved_ids = set()
+        self._unsaved_manifest_ids = set()
+
+        if len(metadata_log.delta_files(self.path_to_output, "metadata")) >= metadata_log.COMPACT_THRESHOLD:
+            self.compact_metadata(background=True)
+
+    def compact_metadata(self, background: bool = False):
+        """
+        Fold the metadata and manifest delta files into metadata.parquet and manifest.parquet.
+        With background set, the compaction runs in a thread and this returns immediately.
+        """
+        if not self.path_to_output:
+            return
+        if background:
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return
+            self._compaction_thread = threading.Thread(target=self._compact_tables,
+                                                       args=(self.path_to_output,), daemon=True)
+            self._compaction_thread.start()
+        else:
+            self._compact_tables(self.path_to_output)
+
+    def _compact_tables(self, folder_path: str):
+        try:
+            folded = sum(metadata_log.compact_table(folder_path, table) for table in ("metadata", "manifest"))
+            if folded:
+                self.message_signal.emit(f"Compacted {folded} metadata delta files")
+        except Exception as e:
+            self.message_signal.emit(f"Compacting metadata failed: {e}")
+
+    @staticmethod
+    def _manifest_schema():
+        return {
+            "id": pl.Utf8,
+            "source_path": pl.Utf8,
+            "source_size": pl.Int64,
+            "source_mtime_ns": pl.Int64,
+            "content_hash": pl.Utf8,
+            "downsample_frequency": pl.Float64,
+            "downsample_method": pl.Utf8,
+            "calculate_dm_dt": pl.Boolean,
+            "dtg": pl.Utf8,
+            "output_file": pl.Utf8,
+        }
+
+    def is_entry_current(self, sample_id: str, source_path: str, preprocessing: dict) -> bool:
+        """
+        Check the manifest whether the stored sample was built from the same source file content
+        with the same preprocessing config, so that the import can skip it.
+
+        Args:
+            sample_id (str): The sample id.
+            source_path (str): Path to the TXT export.
+            preprocessing (dict): The preprocessing config, see TGAEntryPreparator.preprocessing_config.
+
+        Returns:
+            bool: True if the stored sample is up to date.
+        """
+        entry = self.manifest.get(sample_id)
+        if entry is None or not self.path_to_output:
+            return False
+
+        if (entry["source_path"] != os.path.abspath(source_path)
+                or entry["downsample_frequency"] != preprocessing.get("downsample_frequency")
+                or entry.get("downsample_method") != preprocessing.get("downsample_method")
+                or entry["calculate_dm_dt"] != preprocessing.get("calculate_dm_dt")
+                or entry.get("dtg") != preprocessing.get("dtg")
+                or not os.path.exists(os.path.join(self.path_to_output, entry["output_file"]))):
+            return False
+
+        stat = os.stat(source_path)
+        if entry["source_size"] == stat.st_size and entry["source_mtime_ns"] == stat.st_mtime_ns:
+            return True
+
+        # touched or re-synced files keep their entry as long as the content did not change
+        if entry["source_size"] == stat.st_size and entry["content_hash"] == file_content_hash(source_path):
+            entry["source_mtime_ns"] = stat.st_mtime_ns
+            self._unsaved_manifest_ids.add(sample_id)
+            return True
+
+        return False
+
+    def _update_manifest(self, sample_id: str, source_path, preprocessing: dict, output_file: str):
+        stat = os.stat(source_path)
+        self.manifest[sample_id] = {
+            "id": sample_id,
+            "source_path": os.path.abspath(source_path),
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "content_hash": file_content_hash(source_path),
+            "downsample_frequency": preprocessing.get("downsample_frequency"),
+            "downsample_method": preprocessing.get("downsample_method"),
+            "calculate_dm_dt": preprocessing.get("calculate_dm_dt"),
+            "dtg": preprocessing.get("dtg"),
+            "output_file": output_file,
+        }
+        self._unsaved_manifest_ids.add(sample_id)
+
+    def begin_batch(self):
+        """Start collecting metadata rows, they are written once in commit_batch instead of on every add_entry."""
+        if self._batch_rows is None:
+            self._batch_rows = {}
+
+    def commit_batch(self):
+        """Merge all metadata rows collected since begin_batch into the metadata table and save it once."""
+        rows = self._batch_rows
+        self._batch_rows = None
+        if not rows:
+            return
 
-    def add_entry(self, tga_file: TGAFile, gspread_metadata, save: bool = True):
-        """Add or update a TGA entry with associated metadata"""
+        new_rows = pl.DataFrame(list(rows.values()), infer_schema_length=None)
+        if self.metadata_table.is_empty():
+            self.metadata_table = new_rows
+        else:
+            kept_rows = self.metadata_table.filter(~pl.col("id").is_in(list(rows.keys())))
+            self.metadata_table = pl.concat([kept_rows, new_rows.select(kept_rows.columns)],
+                                            how="vertical_relaxed", rechunk=True)
+        self._rebuild_id_index()
+        self._unsaved_ids.update(rows.keys())
+        self.save_metadata()
+        self.metadata_committed.emit()
+        self.message_signal.emit(f"Committed {len(rows)} entries")
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager around begin_batch/commit_batch, e.g.:
+
+            with dataset_model.batch():
+                for tga_file, metadata in entries:
+                    dataset_model.add_entry(tga_file, metadata)
+        """
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.commit_batch()
+
+    def add_entry(self, tga_file: TGAFile, gspread_metadata, save: bool = True, preprocessing: dict | None = None):
+        """
+        Add or update a TGA entry with associated metadata.
+        Inside a batch the metadata row is only collected and save is ignored, see begin_batch.
+        If the preprocessing config is given, the entry is recorded in the import manifest.
+        """
         if not self.path_to_output:
             self.message_signal.emit("No directory set. Please set a directory first.")
             return
 
         sample_id = tga_file.id
         tga_df = tga_file.data
+        # sorted by time, the row group statistics let t_s windows skip most of the file (see read_entry)
+        if "t_s" in tga_df.columns and not tga_df["t_s"].is_sorted():
+            tga_df = tga_df.sort("t_s")
+
+        # Save TGA data
+        sample_parquet = sample_path(self.path_to_output, sample_id, self.storage_layout, self.storage_format)
+        if os.path.exists(sample_parquet):
+            os.remove(sample_parquet)
+        os.makedirs(os.path.dirname(sample_parquet), exist_ok=True)
+        write_options = self.ipc_options if self.storage_format == FORMAT_IPC else self.parquet_options
+        write_sample(tga_df, sample_parquet, self.storage_format, write_options)
+        if self.pyramid:
+            write_pyramid(tga_df, self.path_to_output, sample_id, self.storage_layout, self.pyramid,
+                          self.storage_format, write_options)
+
+        if preprocessing is not None:
+            self._update_manifest(sample_id, tga_file.path, preprocessing,
+                                  sample_file(sample_id, self.storage_layout, self.storage_format))
+
+        self.update_metadata(tga_file, gspread_metadata, save=save)
+
+    def update_metadata(self, tga_file: TGAFile, gspread_metadata, save: bool = True):
+        """Add or update the metadata row of a TGA entry without touching its sample data"""
+        sample_id = tga_file.id
 
         # Merge metadata
         combined_metadata = {**gspread_metadata, **tga_file.metadata, "id": sample_id}
         new_row = pl.DataFrame([combined_metadata])
 
-        # Save TGA data
-        sample_parquet = os.path.join(self.path_to_output, f"sample_{sample_id}.parquet")
-        if os.path.exists(sample_parquet):
-            os.remove(sample_parquet)
-        tga_df.write_parquet(sample_parquet, compression="gzip")
+        if self._batch_rows is not None:
+            self._collect_batch_row(combined_metadata)
+            return
 
         # Update metadata table
-        if not self.metadata_table.is_empty():
+        if sample_id in self.id_index:
             self.metadata_table = self.metadata_table.filter(pl.col("id") != sample_id)
+            self._rebuild_id_index()
 
         if len(self.metadata_table.columns) != len(new_row.columns) and len(self.metadata_table.columns) > 0:
             self.message_signal.emit("Metadata columns do not match. Please check the data.")
@@ -84,21 +432,72 @@ class TGADatasetModel(QObject):
             return
 
         self.metadata_table = pl.concat([self.metadata_table, new_row], rechunk=True)
+        self.id_index.add(sample_id, len(self.metadata_table) - 1)
+        self._unsaved_ids.add(sample_id)
 
         if save:
             self.save_metadata()
 
+        self.entry_added.emit(combined_metadata)
         self.message_signal.emit(f"Added/updated entry: {sample_id}")
 
-    def read_entry(self, sample_id: str) -> pl.DataFrame | None:
-        """Load TGA data for given sample"""
+    def _collect_batch_row(self, combined_metadata: dict):
+        """Keep a metadata row until commit_batch, the column check matches the one of add_entry."""
+        if self._batch_rows:
+            columns = list(next(iter(self._batch_rows.values())).keys())
+        else:
+            columns = self.metadata_table.columns
+
+        if len(columns) != len(combined_metadata) and len(columns) > 0:
+            self.message_signal.emit("Metadata columns do not match. Please check the data.")
+            self.message_signal.emit(f"Metadata columns: {columns}, New row columns: {list(combined_metadata)}")
+            print(f"Metadata columns: {columns}, New row columns: {list(combined_metadata)}")
+            return
+
+        self._batch_rows[combined_metadata["id"]] = combined_metadata
+        self.entry_added.emit(combined_metadata)
+        self.message_signal.emit(f"Added/updated entry: {combined_metadata['id']}")
+
+    def _input_sample_path(self, sample_id: str) -> str:
+        """
+        Path of the sample file in the input folder. Layout and format are detected once per input path
+        instead of listing the folder and reading dataset.json for every sample. A folder without sample
+        data is detected again on the next call.
+        """
+        if self._input_storage is None or self._input_storage[0] != self.path_to_input:
+            layout = detect_layout(self.path_to_input)
+            self._input_storage = (self.path_to_input, layout, detect_storage_format(self.path_to_input))
+        _, layout, storage_format = self._input_storage
+        if layout is None:
+            self._input_storage = None
+        return sample_path(self.path_to_input, sample_id, layout or LAYOUT_FILES, storage_format)
+
+    def read_entry(self, sample_id: str, columns: list[str] | None = None, t_range: tuple | None = None,
+                   T_range: tuple | None = None) -> pl.DataFrame | None:
+        """
+        Load TGA data for given sample, optionally only the given columns and the rows inside a t_s and/or T_C
+        window given as (start, end). Both are evaluated while reading the parquet file.
+        """
+        if not self.path_to_input:
+            self.message_signal.emit("No directory set")
+            return None
+
+        sample_parquet = self._input_sample_path(sample_id)
+        if os.path.exists(sample_parquet):
+            return read_sample(sample_parquet, columns, range_predicate(t_range, T_range))
+        else:
+            self.message_signal.emit(f"Sample {sample_id} not found")
+            return None
+
+    def scan_entry(self, sample_id: str) -> pl.LazyFrame | None:
+        """Lazily scan TGA data for given sample, nothing is read before the frame is collected"""
         if not self.path_to_input:
             self.message_signal.emit("No directory set")
             return None
 
-        sample_parquet = os.path.join(self.path_to_input, f"sample_{sample_id}.parquet")
+        sample_parquet = self._input_sample_path(sample_id)
         if os.path.exists(sample_parquet):
-            return pl.read_parquet(sample_parquet)
+            return scan_sample(sample_parquet)
         else:
             self.message_signal.emit(f"Sample {sample_id} not found")
             return None
@@ -107,10 +506,20 @@ class TGADatasetModel(QObject):
         """Find metadata for given sample ID"""
         if self.metadata_table.is_empty():
             return pl.DataFrame()
-        return self.metadata_table.filter(pl.col("id") == sample_id)
+        return self.id_index.take(self.metadata_table, [sample_id])
 
-    def find(self, column_name: str, value, operator: str = "==") -> list[dict]:
-        """Single condition search"""
+    def find_metadata_multiple(self, sample_ids: list[str]) -> pl.DataFrame:
+        """Find metadata for several sample IDs at once, rows follow the order of sample_ids"""
+        if self.metadata_table.is_empty():
+            return pl.DataFrame()
+        return self.id_index.take(self.metadata_table, sample_ids)
+
+    def find(self, column_name: str, value, operator: str = "==", columns: list[str] | None = None,
+             t_range: tuple | None = None, T_range: tuple | None = None) -> list[TGAEntryResult]:
+        """
+        Single condition search. The sample data of the results is read on first access,
+        restricted to columns and the t_range / T_range windows (see read_entry) if given.
+        """
         ops = {
             "==": lambda c, v: c == v,
             "!=": lambda c, v: c != v,
@@ -129,10 +538,11 @@ class TGADatasetModel(QObject):
             return []
 
         filtered = self.metadata_table.filter(ops[operator](pl.col(column_name), value))
-        return [self._create_result_dict(row) for row in filtered.to_dicts()]
+        return self._create_results(filtered, columns, t_range, T_range)
 
-    def find_all(self, conditions: list[tuple[str, str, object]]) -> list[dict]:
-        """Multi-condition search with AND logic"""
+    def find_all(self, conditions: list[tuple[str, str, object]], columns: list[str] | None = None,
+                 t_range: tuple | None = None, T_range: tuple | None = None) -> list[TGAEntryResult]:
+        """Multi-condition search with AND logic, see find for columns, t_range and T_range"""
         ops = {
             "==": lambda c, v: c == v,
             "!=": lambda c, v: c != v,
@@ -152,18 +562,30 @@ class TGADatasetModel(QObject):
                 return []
             filtered = filtered.filter(ops[op](pl.col(col_name), val))
 
-        return [self._create_result_dict(row) for row in filtered.to_dicts()]
-
-    def _create_result_dict(self, row_dict: dict) -> dict:
-        """Helper method to create result dictionary with metadata and data"""
-        sample_id = row_dict.get("id")
-        if not sample_id:
-            return {}
-        return {
-            "metadata": row_dict,
-            "data": self.read_entry(sample_id)
-        }
+        return self._create_results(filtered, columns, t_range, T_range)
+
+    def _create_results(self, filtered: pl.DataFrame, columns: list[str] | None,
+                        t_range: tuple | None, T_range: tuple | None) -> list[TGAEntryResult]:
+        """Helper method to create the lazy results of the metadata rows with an id"""
+        return [TGAEntryResult(self, row_dict, columns=columns, t_range=t_range, T_range=T_range)
+                for row_dict in filtered.to_dicts() if row_dict.get("id")]
+
+    def load_all(self, results: list[TGAEntryResult], parallel: bool = True,
+                 workers: int | None = None) -> list[TGAEntryResult]:
+        """
+        Read the sample data of all results that are not loaded yet, in a thread pool if parallel is set.
+        Returns the results, so that e.g. model.load_all(model.find(...)) can be iterated directly.
+        """
+        pending = [result for result in results if not result.is_loaded]
+        if parallel and len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1)) as executor:
+                frames = list(executor.map(lambda result: result.load(), pending))
+        else:
+            frames = [result.load() for result in pending]
 
+        for result, df in zip(pending, frames):
+            result.set_data(df)
+        return results
 
 
 def create_dataset(path_to_directory):
@@ -0,0 +1,73 @@
+import polars as pl
+
+
+class TGAEntryResult:
+    def __init__(self, dataset_model, metadata: dict, columns: list[str] | None = None,
+                 t_range: tuple[float | None, float | None] | None = None,
+                 T_range: tuple[float | None, float | None] | None = None):
+        """
+        Result of TGADatasetModel.find / find_all. The metadata row is available right away, the sample data
+        is only read when data is first accessed (or by TGADatasetModel.load_all).
+
+        For compatibility with the former result dicts, result["metadata"] and result["data"] still work.
+
+        Args:
+            dataset_model (TGADatasetModel): The model the sample data is read from.
+            metadata (dict): The metadata row of the entry.
+            columns (list[str], optional): Only read these sample columns.
+            t_range (tuple, optional): Only read rows with t_s in [start, end], either bound may be None.
+            T_range (tuple, optional): Only read rows with T_C in [start, end], either bound may be None.
+        """
+        self.dataset_model = dataset_model
+        self.metadata = metadata
+        self.columns = columns
+        self.t_range = t_range
+        self.T_range = T_range
+        self._data = None
+        self._loaded = False
+
+    @property
+    def id(self) -> str:
+        return self.metadata.get("id")
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def data(self) -> pl.DataFrame | None:
+        """The sample data, read on first access. None if the sample file does not exist."""
+        if not self._loaded:
+            self.set_data(self.load())
+        return self._data
+
+    def load(self, columns: list[str] | None = None, t_range: tuple[float | None, float | None] | None = None,
+             T_range: tuple[float | None, float | None] | None = None) -> pl.DataFrame | None:
+        """
+        Read the sample data without keeping it, optionally with a different projection than the one of
+        the result. Only the requested columns and row groups are read from the parquet file.
+        """
+        return self.dataset_model.read_entry(self.id,
+                                             columns=columns if columns is not None else self.columns,
+                                             t_range=t_range if t_range is not None else self.t_range,
+                                             T_range=T_range if T_range is not None else self.T_range)
+
+    def set_data(self, df: pl.DataFrame | None):
+        """Keep df as the loaded sample data, e.g. after reading several results at once (load_all)."""
+        self._data = df
+        self._loaded = True
+
+    def unload(self):
+        """Drop the loaded sample data, the next access of data reads it again."""
+        self._data = None
+        self._loaded = False
+
+    def __getitem__(self, key):
+        if key == "metadata":
+            return self.metadata
+        if key == "data":
+            return self.data
+        raise KeyError(key)
+
+    def __repr__(self) -> str:
+        return f"TGAEntryResult(id={self.id!r}, loaded={self._loaded})"
@@ -1,21 +1,95 @@
 from datetime import datetime
+import io
 import polars as pl
 import re
 from pathlib import Path
 
+from fastTGA.models.derivatives import Derivative, METHOD_CENTRAL
+from fastTGA.models.downsampling import Downsampler, make_downsampler
+
+
+# Bump whenever parsing changes the resulting metadata or data, cached parse results are keyed on it
+PARSER_VERSION = 1
+
+# Column names of the instrument export mapped to the names used in the dataset
+RENAME_DICT = {
+    "Time(s)": "t_s",
+    "Temperature(°C)": "T_C",
+    "Corrected delta m(mg)": "dm_mg",
+    "Delta m(mg)": "dm_mg",
+    "Gas 1(sccm/min)": "gas1_l_min",
+    "Gas 2(sccm/min)": "gas2_l_min",
+    "Purge(sccm/min)": "purge_l_min",
+    "DTA_RAW(1)": "DTA1",
+    "POWER(%)": "power_pct",
+    "TEMP_CJR_FURNACE(K)": "T_cjr_furnace_K",
+    "TEMP_CJR_SAMPLE(K)": "T_cjr_sample_K",
+    "TEMP_FURNACE(K)": "T_furnace_K",
+    "TEMP_NOM_FURNACE(K)": "T_nom_furnace_K",
+    "TGA_RAW(mg)": "TGA_raw_mg",
+    # Add more mappings as needed
+}
+
 
 class TGAFile():
-    def __init__(self, path_to_file):
+    def __init__(self, path_to_file, single_pass=True, lazy=False):
         self.path = Path(path_to_file)
         self.metadata = {}
-        self.data = None
+        self.single_pass = single_pass
+        self.lazy = lazy
+
+        # Either a pl.DataFrame or, for lazy files, a pl.LazyFrame holding the query plan
+        self._frame = None
+        self._columns = []
+        self._header_rows = 0
 
         self.parse_file()
 
+    @classmethod
+    def from_frame(cls, path_to_file, metadata, frame):
+        """
+        Create a TGAFile from already parsed metadata and data, e.g. from a parse cache.
+        Passing a pl.LazyFrame as frame creates a lazy TGAFile.
+        """
+        tga_file = cls.__new__(cls)
+        tga_file.path = Path(path_to_file)
+        tga_file.metadata = dict(metadata)
+        tga_file.single_pass = True
+        tga_file.lazy = isinstance(frame, pl.LazyFrame)
+        tga_file._frame = frame
+        tga_file._columns = list(frame.collect_schema().names())
+        tga_file._header_rows = 0
+        return tga_file
+
     @property
     def id(self):
         return self.metadata.get('name', None)
 
+    @property
+    def data(self) -> pl.DataFrame:
+        """The measurement data. For lazy files the query plan is collected on first access."""
+        if self.lazy and self._frame is None:
+            self._frame = self._scan_data_block()
+        if isinstance(self._frame, pl.LazyFrame):
+            self._frame = self._frame.collect()
+        return self._frame
+
+    @data.setter
+    def data(self, df):
+        self._frame = df
+
+    @property
+    def lazy_data(self) -> pl.LazyFrame:
+        """The measurement data as a pl.LazyFrame. The data block is not read before the plan is collected."""
+        if self._frame is None and self.lazy:
+            self._frame = self._scan_data_block()
+        return self._frame.lazy()
+
+    def collect(self) -> "TGAFile":
+        """Execute the lazy query plan, so that the data is held in memory."""
+        self._frame = self.data
+        return self
+
     def _parse_date(self, date_str):
         """Parse German date format to datetime object."""
         date_str = date_str.strip('# ')
@@ -49,7 +123,30 @@ class TGAFile():
             print(f"Error parsing weight: {weight_str}")
             return None
 
+    def _parse_header_line(self, line):
+        """Store the metadata found in a single '#' header line."""
+        line = line.strip()
+        if 'Export date and time:' in line:
+            self.metadata['export_date'] = self._parse_date(line.split(':', 1)[1])
+        elif 'Measurement date and time:' in line:
+            self.metadata['measurement_date'] = self._parse_date(line.split(':', 1)[1])
+        elif 'Name:' in line:
+            self.metadata['name'] = line.split(':', 1)[1].strip()
+        elif 'Weight:' in line:
+            self.metadata['weight'] = self._parse_weight(line)
+
     def parse_file(self):
+        if self.lazy:
+            self._parse_header_only()
+            return
+        if self.single_pass:
+            self._parse_file_single_pass()
+        else:
+            self._parse_file_legacy()
+        self.data = self.data.rename(RENAME_DICT, strict=False)
+
+    def _parse_file_legacy(self):
+        """Read the header in Python, then re-open the file with polars and infer the schema."""
         row_offset = 0
 
         with open(self.path, 'r', encoding='cp1252') as file:
@@ -59,15 +156,7 @@ class TGAFile():
                 if not line.startswith('#'):
                     break
 
-                line = line.strip()
-                if 'Export date and time:' in line:
-                    self.metadata['export_date'] = self._parse_date(line.split(':', 1)[1])
-                elif 'Measurement date and time:' in line:
-                    self.metadata['measurement_date'] = self._parse_date(line.split(':', 1)[1])
-                elif 'Name:' in line:
-                    self.metadata['name'] = line.split(':', 1)[1].strip()
-                elif 'Weight:' in line:
-                    self.metadata['weight'] = self._parse_weight(line)
+                self._parse_header_line(line)
 
         # Read data with polars, using calculated offset
         self.data = pl.read_csv(self.path,
@@ -76,36 +165,89 @@ class TGAFile():
                                 skip_rows=row_offset - 1,
                                 infer_schema_length=90000)
 
-        rename_dict = {
-            "Time(s)": "t_s",
-            "Temperature(°C)": "T_C",
-            "Corrected delta m(mg)": "dm_mg",
-            "Delta m(mg)": "dm_mg",
-            "Gas 1(sccm/min)": "gas1_l_min",
-            "Gas 2(sccm/min)": "gas2_l_min",
-            "Purge(sccm/min)": "purge_l_min",
-            "DTA_RAW(1)": "DTA1",
-            "POWER(%)": "power_pct",
-            "TEMP_CJR_FURNACE(K)": "T_cjr_furnace_K",
-            "TEMP_CJR_SAMPLE(K)": "T_cjr_sample_K",
-            "TEMP_FURNACE(K)": "T_furnace_K",
-            "TEMP_NOM_FURNACE(K)": "T_nom_furnace_K",
-            "TGA_RAW(mg)": "TGA_raw_mg",
-            # Add more mappings as needed
-        }
-        self.data = self.data.rename(rename_dict, strict=False)
+    def _parse_file_single_pass(self):
+        """
+        Read the file once: the header lines are parsed while reading, the remaining bytes
+        (the data block) are handed to polars with a schema pinned for all known columns.
+        """
+        with open(self.path, 'rb') as file:
+            self._read_header(file)
+            data_block = self._decode_data_block(file.read())
+
+        self.data = pl.read_csv(data_block,
+                                separator=',',
+                                has_header=False,
+                                new_columns=self._columns,
+                                **self._schema_arguments(self._columns))
+
+    def _parse_header_only(self):
+        """Parse the header lines only, the data block is scanned lazily when first used."""
+        with open(self.path, 'rb') as file:
+            self._read_header(file)
+        self._frame = None
+
+    def _read_header(self, file):
+        """
+        Parse the '#' header lines and the column line from a binary file handle.
+        The handle is left positioned at the start of the data block.
+        """
+        self._header_rows = 0
+        line = file.readline()
+        while line.startswith(b'#'):
+            self._parse_header_line(line.decode('cp1252'))
+            self._header_rows += 1
+            line = file.readline()
 
-    def downsample(self, downsample_frequency, unit='s'):
-        df = self.data
-        df = self._convert_time_to_milliseconds(df)
-        downsample_frequency = self._convert_frequency_to_milliseconds(downsample_frequency, unit)
-        df = self._downsample_data(df, downsample_frequency)
-        self.data = self._convert_time_back_to_seconds(df)
+        column_line = line.decode('cp1252').strip()
+        self._columns = [column.strip().strip('"') for column in column_line.split(',')]
 
-    def _convert_time_to_milliseconds(self, df):
-        return df.with_columns(
-            (pl.col("t_s") * 1000).cast(pl.Int64),
-        )
+    def _scan_data_block(self) -> pl.LazyFrame:
+        """
+        Build a pl.LazyFrame over the data block, skipping the header and the column line. The block is read
+        here, when the data is first used, because polars cannot decode cp1252 itself.
+        """
+        with open(self.path, 'rb') as file:
+            for _ in range(self._header_rows + 1):
+                file.readline()
+            data_block = self._decode_data_block(file.read())
+
+        lf = pl.scan_csv(io.BytesIO(data_block),
+                         separator=',',
+                         has_header=False,
+                         new_columns=self._columns,
+                         **self._schema_arguments(self._columns))
+        return lf.rename(RENAME_DICT, strict=False)
+
+    @staticmethod
+    def _decode_data_block(data_block: bytes) -> bytes:
+        """The exports are cp1252 encoded (like the header), polars reads UTF-8. Pure ASCII is both."""
+        if data_block.isascii():
+            return data_block
+        return data_block.decode('cp1252').encode('utf-8')
+
+    @staticmethod
+    def _schema_arguments(columns):
+        """
+        Build the schema arguments for pl.read_csv / pl.scan_csv. Columns listed in RENAME_DICT are always
+        numeric, so if every column is known the schema is pinned completely and no inference is needed.
+        """
+        known = {column: pl.Float64 for column in columns if column in RENAME_DICT}
+        if len(known) == len(columns):
+            return {"schema": known}
+        return {"schema_overrides": known, "infer_schema_length": 90000}
+
+    def downsample(self, downsample_frequency, unit='s', method="mean", **options):
+        """
+        Reduce the data to about one row per downsample_frequency, see fastTGA.models.downsampling for the
+        methods ("mean", "envelope", "lttb", "adaptive") and their options. Time stays in seconds.
+        """
+        every_s = self._convert_frequency_to_milliseconds(downsample_frequency, unit) / 1000
+        self.apply_downsampler(make_downsampler(method, every_s, **options))
+
+    def apply_downsampler(self, downsampler: Downsampler):
+        """Downsample with a configured Downsampler. Part of the lazy query plan of lazy files."""
+        df = self.lazy_data if self.lazy else self.data
+        self.data = downsampler.apply(df)
 
     def _convert_frequency_to_milliseconds(self, frequency, unit):
         if unit == 's':
@@ -117,19 +259,14 @@ class TGAFile():
         else:
             raise ValueError(f"Unsupported unit: {unit}")
 
-    def _downsample_data(self, df, downsample_frequency):
-        return df.group_by_dynamic("t_s", every=f"{downsample_frequency}i").agg(pl.all().mean())
-
-    def _convert_time_back_to_seconds(self, df):
-        return df.with_columns(
-            (pl.col("t_s") / (1000 * 60)).cast(pl.Float64),
-        )
+    def calculate_dm_dt_in_s(self, method=METHOD_CENTRAL, window=11, polyorder=2):
+        """Add dm/dt in mg per second as 'dmdt_mg_s', see Derivative for the methods."""
+        self.calculate_derivative(Derivative("dm_mg", "t_s", method, window, polyorder))
 
-    def calculate_dm_dt_in_s(self):
-        # recalculate dmdt as mg per minute
-        self.data = self.data.with_columns(
-            (pl.col("dm_mg").diff() / pl.col("t_s").diff()).alias("dmdt_mg_s")
-        )
+    def calculate_derivative(self, derivative: Derivative):
+        """Add a derivative column, e.g. Derivative(x="T_C") for dm/dT. Part of the lazy query plan of lazy files."""
+        df = self.lazy_data if self.lazy else self.data
+        self.data = derivative.apply(df)
 
 
 if __name__ == "__main__":
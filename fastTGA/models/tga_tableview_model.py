@@ -1,7 +1,9 @@
 from typing import Any
 
+import polars as pl
 from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
 
+from fastTGA.models.id_index import IdIndex
 from fastTGA.models.tga_dataset_model import TGADatasetModel
 
 
@@ -11,6 +13,10 @@ class TGATableviewModel(QAbstractTableModel):
         self.dataset_model = dataset_model
         self._data = dataset_model.metadata_table
         self._headers = self._data.columns if not self._data.is_empty() else []
+        self._id_index = IdIndex(self._data["id"]) if not self._data.is_empty() else IdIndex()
+
+        self.dataset_model.entry_added.connect(self.add_row)
+        self.dataset_model.metadata_committed.connect(self.refresh_data)
 
     def rowCount(self, parent=QModelIndex()) -> int:
         return len(self._data) if not self._data.is_empty() else 0
@@ -41,8 +47,36 @@ class TGATableviewModel(QAbstractTableModel):
         self.beginResetModel()
         self._data = self.dataset_model.metadata_table
         self._headers = self._data.columns if not self._data.is_empty() else []
+        self._id_index = IdIndex(self._data["id"]) if not self._data.is_empty() else IdIndex()
         self.endResetModel()
 
+    def add_row(self, row: dict):
+        """Insert or update a single row while entries are added, refresh_data syncs with the dataset afterwards"""
+        new_row = pl.DataFrame([row])
+
+        if self._data.is_empty():
+            self.beginResetModel()
+            self._data = new_row
+            self._headers = new_row.columns
+            self._id_index = IdIndex(new_row["id"])
+            self.endResetModel()
+            return
+
+        if new_row.columns != list(self._headers):
+            return
+
+        i = self._id_index.row(row.get("id"))
+        if i is not None:
+            self._data = pl.concat([self._data.slice(0, i), new_row, self._data.slice(i + 1)],
+                                   how="vertical_relaxed")
+            self.dataChanged.emit(self.index(i, 0), self.index(i, len(self._headers) - 1))
+        else:
+            n = len(self._data)
+            self.beginInsertRows(QModelIndex(), n, n)
+            self._data = pl.concat([self._data, new_row], how="vertical_relaxed")
+            self._id_index.add(row.get("id"), n)
+            self.endInsertRows()
+
     def get_row_data(self, row: int) -> dict:
         """Get all data for a specific row"""
         if self._data.is_empty() or row >= len(self._data):
@@ -51,8 +85,13 @@ class TGATableviewModel(QAbstractTableModel):
 
     def get_sample_id(self, row: int) -> str | None:
         """Get sample ID for a specific row"""
-        row_data = self.get_row_data(row)
-        return row_data.get('id')
+        if self._data.is_empty() or row >= len(self._data):
+            return None
+        return self._data["id"][row]
+
+    def get_row(self, sample_id: str) -> int | None:
+        """Get the row of a sample ID, e.g. to select it in the view"""
+        return self._id_index.row(sample_id)
 
     def flags(self, index: QModelIndex) -> Qt.ItemFlag:
         return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
\ No newline at end of file
@@ -3,6 +3,17 @@ from abc import abstractmethod, ABC
 import polars as pl
 
 class DataFilter(ABC):
+    def expr(self) -> pl.Expr | None:
+        """
+        Return the filter condition as a polars expression (rows for which it is True are kept).
+        Filters that return an expression can be combined into one predicate and pushed down into the
+        parquet scan. Filters that cannot be expressed this way return None and only implement apply.
+
+        Returns:
+            pl.Expr | None: The filter condition.
+        """
+        return None
+
     @abstractmethod
     def apply(self, df: pl.DataFrame) -> pl.DataFrame:
         """
@@ -22,11 +33,14 @@ class CutAwayPurgeFreezingFilter(DataFilter):
         self.col = col
         self.threshold = threshold
 
-    def apply(self, df: pl.DataFrame) -> pl.DataFrame:
+    def expr(self) -> pl.Expr:
         """
         Only keep rows for which the value in self.col is less than self.threshold.
         """
-        return df.filter(pl.col(self.col) < self.threshold)
+        return pl.col(self.col) < self.threshold
+
+    def apply(self, df: pl.DataFrame) -> pl.DataFrame:
+        return df.filter(self.expr())
 
 
 class MaxTemperatureFilter(DataFilter):
@@ -34,19 +48,25 @@ class MaxTemperatureFilter(DataFilter):
         self.col = col
         self.threshold = threshold
 
-    def apply(self, df: pl.DataFrame) -> pl.DataFrame:
+    def expr(self) -> pl.Expr:
         """
         Only keep rows for which the value in self.col is less than self.threshold.
         """
-        return df.filter(pl.col(self.col) < self.threshold)
+        return pl.col(self.col) < self.threshold
+
+    def apply(self, df: pl.DataFrame) -> pl.DataFrame:
+        return df.filter(self.expr())
 
 class MinGasFlowRateFilter(DataFilter):
     def __init__(self, col: str, threshold: float):
         self.col = col
         self.threshold = threshold
 
-    def apply(self, df: pl.DataFrame) -> pl.DataFrame:
+    def expr(self) -> pl.Expr:
         """
         Only keep rows for which the value in self.col is greater than self.threshold.
         """
-        return df.filter(pl.col(self.col) > self.threshold)
\ No newline at end of file
+        return pl.col(self.col) > self.threshold
+
+    def apply(self, df: pl.DataFrame) -> pl.DataFrame:
+        return df.filter(self.expr())
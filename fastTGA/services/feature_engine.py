@@ -0,0 +1,228 @@
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from typing import List
+
+import polars as pl
+
+from fastTGA.models.dataset_layout import sample_path
+from fastTGA.models.derivatives import Derivative, METHOD_SAVGOL
+from fastTGA.services.sample_repository import SampleRepository
+
+
+FEATURES_FILE = "features.parquet"
+
+# Key of the parquet key-value metadata holding the configuration the features were computed with
+FEATURE_CONFIG_KEY = "fastTGA:feature_config"
+
+
+class Feature(ABC):
+    # Metadata columns the expressions need, they are joined to the sample rows by 'id'
+    metadata_columns: List[str] = []
+
+    @abstractmethod
+    def exprs(self) -> List[pl.Expr]:
+        """
+        Return the aggregation expressions of this feature. They are evaluated per sample
+        (group_by("id").agg(...)) on the raw sample data, sorted by time.
+
+        Returns:
+            List[pl.Expr]: One named expression per feature column.
+        """
+
+    def config(self) -> str:
+        """Identifies the feature and its parameters, stored features are recomputed when it changes."""
+        return f"{type(self).__name__}({sorted(vars(self).items())})"
+
+
+class TotalMassLoss(Feature):
+    def __init__(self, mass_column: str = "dm_mg"):
+        self.mass_column = mass_column
+
+    def exprs(self) -> List[pl.Expr]:
+        """Mass lost between the first and the last row."""
+        mass = pl.col(self.mass_column)
+        return [(mass.first() - mass.last()).alias("total_mass_loss_mg")]
+
+
+class MassLossAtTemperature(Feature):
+    def __init__(self, temperature: float, mass_column: str = "dm_mg", temperature_column: str = "T_C"):
+        self.temperature = temperature
+        self.mass_column = mass_column
+        self.temperature_column = temperature_column
+
+    def exprs(self) -> List[pl.Expr]:
+        """Mass lost until the temperature first reaches self.temperature, null if it never does."""
+        mass = pl.col(self.mass_column)
+        reached = pl.col(self.temperature_column) >= self.temperature
+        return [(mass.first() - mass.filter(reached).first()).alias(f"mass_loss_{self.temperature:g}C_mg")]
+
+
+class OnsetTemperature(Feature):
+    def __init__(self, fraction: float = 0.05, mass_column: str = "dm_mg", temperature_column: str = "T_C"):
+        self.fraction = fraction
+        self.mass_column = mass_column
+        self.temperature_column = temperature_column
+
+    def exprs(self) -> List[pl.Expr]:
+        """Temperature at which the mass loss first reaches self.fraction of the maximum mass loss."""
+        mass = pl.col(self.mass_column)
+        loss = mass.first() - mass
+        started = (loss >= self.fraction * loss.max()) & (loss > 0)
+        return [pl.col(self.temperature_column).filter(started).first().alias("onset_T_C")]
+
+
+class PeakDTG(Feature):
+    def __init__(self, method: str = METHOD_SAVGOL, window: int = 11, mass_column: str = "dm_mg",
+                 time_column: str = "t_s", temperature_column: str = "T_C"):
+        self.method = method
+        self.window = window
+        self.mass_column = mass_column
+        self.time_column = time_column
+        self.temperature_column = temperature_column
+
+    def exprs(self) -> List[pl.Expr]:
+        """Highest mass loss rate (most negative dm/dt) and the temperature at which it occurs."""
+        rate = Derivative(self.mass_column, self.time_column, self.method, self.window).expr()
+        return [rate.min().alias("peak_dtg_rate_mg_s"),
+                pl.col(self.temperature_column).get(rate.arg_min()).alias("peak_dtg_T_C")]
+
+
+class ResidualMass(Feature):
+    def __init__(self, mass_column: str = "dm_mg", weight_column: str = "weight"):
+        self.mass_column = mass_column
+        self.weight_column = weight_column
+        self.metadata_columns = [weight_column]
+
+    def exprs(self) -> List[pl.Expr]:
+        """Mass left at the end in percent of the initial sample weight (metadata), null without a weight."""
+        mass, weight = pl.col(self.mass_column), pl.col(self.weight_column).first()
+        return [(100 * (weight + mass.last() - mass.first()) / weight).alias("residual_mass_pct")]
+
+
+DEFAULT_FEATURES = [
+    TotalMassLoss(),
+    MassLossAtTemperature(600),
+    MassLossAtTemperature(800),
+    OnsetTemperature(),
+    PeakDTG(),
+    ResidualMass(),
+]
+
+
+class FeatureEngine:
+    def __init__(self, repository: SampleRepository, features: List[Feature] = None):
+        """
+        Computes scalar features (see Feature) for all samples of a dataset and stores them in features.parquet
+        next to metadata.parquet, one row per 'id'. update() only recomputes samples whose sample file changed
+        since the stored features were computed, or all of them if the feature configuration changed.
+
+            engine = FeatureEngine(SampleRepository(folder))
+            engine.update()
+            table = engine.table()  # metadata joined with the features
+
+        Args:
+            repository (SampleRepository): The dataset. Its filters, time matching and data filters are not used,
+                features are computed on the raw sample data of every sample in the metadata.
+            features (List[Feature], optional): The features to compute. Defaults to DEFAULT_FEATURES.
+        """
+        self.repository = repository
+        self.features = features if features is not None else list(DEFAULT_FEATURES)
+        self.features_file = os.path.join(repository.folder_path, FEATURES_FILE)
+        # ids recomputed by the last update()
+        self.last_recomputed: List[str] = []
+
+    def config_key(self) -> str:
+        configs = "|".join(feature.config() for feature in self.features)
+        return hashlib.sha1(configs.encode("utf-8")).hexdigest()
+
+    def compute(self, sample_ids: List[str]) -> pl.DataFrame:
+        """
+        Computes the features of the given samples in one grouped pass, without reading or writing features.parquet.
+
+        Returns:
+            pl.DataFrame: Column 'id' and one column per feature expression.
+        """
+        lf = self.repository.scan_samples(sample_ids)
+        if not sample_ids or not lf.collect_schema().names():
+            return pl.DataFrame()
+
+        metadata_columns = sorted({c for feature in self.features for c in feature.metadata_columns})
+        if metadata_columns:
+            metadata = (self.repository.metadata.lazy()
+                        .select("id", *metadata_columns)
+                        .with_columns(pl.col("id").cast(pl.Utf8)))
+            lf = lf.join(metadata, on="id", how="left")
+
+        exprs = [expr for feature in self.features for expr in feature.exprs()]
+        return (lf.sort("id", "t_s", maintain_order=True)
+                .group_by("id", maintain_order=True)
+                .agg(exprs)
+                .collect())
+
+    def _source_stats(self, sample_ids: List[str]) -> pl.DataFrame:
+        """Modification time and size of the sample files, a change means the features must be recomputed."""
+        rows = []
+        for sample_id in sample_ids:
+            path = sample_path(self.repository.folder_path, sample_id,
+                               self.repository.layout, self.repository.storage_format)
+            if os.path.exists(path):
+                stat = os.stat(path)
+                rows.append({"id": sample_id, "source_mtime_ns": stat.st_mtime_ns, "source_size": stat.st_size})
+        return pl.DataFrame(rows, schema={"id": pl.Utf8, "source_mtime_ns": pl.Int64, "source_size": pl.Int64})
+
+    def read(self) -> pl.DataFrame | None:
+        """The stored features, or None if there are none or they were computed with another configuration."""
+        if not os.path.exists(self.features_file):
+            return None
+        if pl.read_parquet_metadata(self.features_file).get(FEATURE_CONFIG_KEY) != self.config_key():
+            return None
+        return pl.read_parquet(self.features_file)
+
+    def update(self, force: bool = False) -> pl.DataFrame:
+        """
+        Recomputes the features of new and changed samples, drops the ones of removed samples and writes
+        features.parquet.
+
+        Args:
+            force (bool, optional): Recompute all samples. Defaults to False.
+
+        Returns:
+            pl.DataFrame: The features of all samples, with the 'source_mtime_ns' and 'source_size' columns.
+        """
+        sample_ids = [str(i) for i in self.repository.metadata["id"]]
+        stats = self._source_stats(sample_ids)
+        stored = None if force else self.read()
+
+        if stored is None:
+            changed = stats["id"].to_list()
+            kept = None
+        else:
+            current = stats.join(stored.select("id", "source_mtime_ns", "source_size"),
+                                 on=["id", "source_mtime_ns", "source_size"], how="semi")
+            changed = stats.join(current, on="id", how="anti")["id"].to_list()
+            kept = stored.join(current.select("id"), on="id", how="semi")
+
+        computed = self.compute(changed)
+        if not computed.is_empty():
+            computed = computed.join(stats, on="id", how="left")
+        if kept is None or kept.is_empty():
+            features = computed
+        elif computed.is_empty():
+            features = kept
+        else:
+            features = pl.concat([kept, computed.select(kept.columns)], how="vertical_relaxed")
+
+        if not features.is_empty() and (changed or stored is None or kept.height != stored.height):
+            features.write_parquet(self.features_file + ".tmp", metadata={FEATURE_CONFIG_KEY: self.config_key()})
+            os.replace(self.features_file + ".tmp", self.features_file)
+        self.last_recomputed = changed
+        return features
+
+    def table(self) -> pl.DataFrame:
+        """The metadata of the repository joined with the stored features by 'id', after updating them."""
+        features = self.update().drop("source_mtime_ns", "source_size", strict=False)
+        metadata = self.repository.metadata.with_columns(pl.col("id").cast(pl.Utf8))
+        if features.is_empty():
+            return metadata
+        return metadata.join(features, on="id", how="left")
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import polars as pl
+
+from fastTGA.models.tga_file import TGAFile, PARSER_VERSION
+
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(Path.home(), ".fastTGA", "parse_cache")
+
+
+class TGAParseCache:
+    def __init__(self,
+                 cache_directory: str = DEFAULT_CACHE_DIRECTORY,
+                 max_total_bytes: int | None = 2 * 1024 ** 3,
+                 max_age_s: float | None = 90 * 24 * 3600):
+        """
+        On-disk cache of parsed TGA exports. Every entry consists of
+          • {key}.json – The header metadata and the cache key information.
+          • {key}.parquet – The parsed data block.
+        The key is derived from (absolute path, file size, mtime, PARSER_VERSION), so modified exports
+        and parser changes automatically miss the cache.
+
+        Args:
+            cache_directory (str): Folder holding the cache entries.
+            max_total_bytes (int, optional): Size limit of the cache, least recently used entries are evicted first.
+            max_age_s (float, optional): Entries not used for longer than this are evicted.
+        """
+        self.cache_directory = cache_directory
+        self.max_total_bytes = max_total_bytes
+        self.max_age_s = max_age_s
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.cache_directory, exist_ok=True)
+
+    def _key(self, path: str) -> str:
+        stat = os.stat(path)
+        key_source = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{PARSER_VERSION}"
+        return hashlib.sha1(key_source.encode("utf-8")).hexdigest()
+
+    def _entry_paths(self, key: str) -> tuple[str, str]:
+        return (os.path.join(self.cache_directory, f"{key}.json"),
+                os.path.join(self.cache_directory, f"{key}.parquet"))
+
+    def load(self, path: str, lazy: bool = True) -> TGAFile:
+        """
+        Returns the parsed TGAFile for path. On a cache hit the data is read from the cached parquet file
+        (as a pl.LazyFrame if lazy is set), on a miss the export is parsed and stored in the cache.
+        Counts the hit or miss and evicts old entries after a miss.
+
+        Args:
+            path (str): Path to the TXT export.
+            lazy (bool, optional): Return a lazy TGAFile on cache hits. Defaults to True.
+
+        Returns:
+            TGAFile: The parsed file.
+        """
+        tga_file, hit = self.fetch(path, lazy)
+        self.record(hit)
+        if not hit:
+            self.evict()
+        return tga_file
+
+    def fetch(self, path: str, lazy: bool = True) -> tuple[TGAFile, bool]:
+        """
+        Like load, but neither counts the request nor evicts. Used by worker processes, whose counters the
+        calling process never sees and which must not evict concurrently. The calling process passes the
+        returned hit flag to record and evicts once all workers are done.
+
+        Returns:
+            tuple[TGAFile, bool]: The parsed file and whether it was read from the cache.
+        """
+        key = self._key(path)
+        json_path, parquet_path = self._entry_paths(key)
+
+        if os.path.exists(json_path) and os.path.exists(parquet_path):
+            try:
+                metadata = self._read_metadata(json_path)
+                frame = pl.scan_parquet(parquet_path) if lazy else pl.read_parquet(parquet_path)
+                self._touch(json_path, parquet_path)
+                return TGAFile.from_frame(path, metadata, frame), True
+            except Exception as e:
+                print(f"Warning: Corrupt parse cache entry for {path}, parsing again. Error: {e}")
+                self._remove_entry(key)
+
+        tga_file = TGAFile(path)
+        self._store(key, path, tga_file)
+        if lazy:
+            # the same plan as on a hit, eager and lazy downsampling can differ in the last bits
+            tga_file = TGAFile.from_frame(path, tga_file.metadata, tga_file.data.lazy())
+        return tga_file, False
+
+    def record(self, hit: bool):
+        """Count a cache request, see fetch."""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def _store(self, key: str, path: str, tga_file: TGAFile):
+        json_path, parquet_path = self._entry_paths(key)
+
+        # write to temporary files first so that concurrent readers never see half written entries
+        tga_file.data.write_parquet(parquet_path + ".tmp", compression="zstd")
+        os.replace(parquet_path + ".tmp", parquet_path)
+
+        metadata = {k: v.isoformat() if isinstance(v, datetime) else v for k, v in tga_file.metadata.items()}
+        entry = {
+            "source": os.path.abspath(path),
+            "parser_version": PARSER_VERSION,
+            "metadata": metadata,
+            "datetime_keys": [k for k, v in tga_file.metadata.items() if isinstance(v, datetime)],
+        }
+        with open(json_path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(json_path + ".tmp", json_path)
+
+    @staticmethod
+    def _read_metadata(json_path: str) -> dict:
+        with open(json_path, "r", encoding="utf-8") as file:
+            entry = json.load(file)
+        metadata = entry["metadata"]
+        for k in entry.get("datetime_keys", []):
+            metadata[k] = datetime.fromisoformat(metadata[k])
+        return metadata
+
+    @staticmethod
+    def _touch(*paths: str):
+        """Mark the entry as recently used, eviction is based on the modification time."""
+        for path in paths:
+            os.utime(path)
+
+    def _remove_entry(self, key: str):
+        for path in self._entry_paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # already removed, e.g. by another process using the same cache
+
+    def _entries(self) -> list[dict]:
+        """Lists all cache entries with their total size and last use time."""
+        entries = {}
+        for filename in os.listdir(self.cache_directory):
+            key, extension = os.path.splitext(filename)
+            if extension not in {".json", ".parquet"}:
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_directory, filename))
+            except FileNotFoundError:
+                continue  # removed since listdir
+            entry = entries.setdefault(key, {"key": key, "size": 0, "last_used": 0.0})
+            entry["size"] += stat.st_size
+            entry["last_used"] = max(entry["last_used"], stat.st_mtime)
+        return list(entries.values())
+
+    def evict(self) -> int:
+        """
+        Removes entries older than max_age_s, then the least recently used entries until the cache
+        is smaller than max_total_bytes.
+
+        Returns:
+            int: Number of evicted entries.
+        """
+        entries = sorted(self._entries(), key=lambda e: e["last_used"])
+        now = time.time()
+        evicted = 0
+
+        if self.max_age_s is not None:
+            expired = [e for e in entries if now - e["last_used"] > self.max_age_s]
+            for entry in expired:
+                self._remove_entry(entry["key"])
+            evicted += len(expired)
+            entries = [e for e in entries if now - e["last_used"] <= self.max_age_s]
+
+        if self.max_total_bytes is not None:
+            total_size = sum(e["size"] for e in entries)
+            for entry in entries:
+                if total_size <= self.max_total_bytes:
+                    break
+                self._remove_entry(entry["key"])
+                total_size -= entry["size"]
+                evicted += 1
+
+        self.evictions += evicted
+        return evicted
+
+    def clear(self):
+        """Removes all cache entries."""
+        for entry in self._entries():
+            self._remove_entry(entry["key"])
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss/eviction counters and the current size of the cache.
+
+        Returns:
+            dict: Cache statistics.
+        """
+        entries = self._entries()
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "entries": len(entries),
+            "size_bytes": sum(e["size"] for e in entries),
+        }
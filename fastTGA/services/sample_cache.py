@@ -0,0 +1,108 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import polars as pl
+
+
+class SampleFrameCache:
+    def __init__(self, max_bytes: int = 512 * 1024 ** 2):
+        """
+        In-process LRU cache of loaded sample DataFrames, bounded by the total estimated size of the frames
+        (pl.DataFrame.estimated_size) instead of the number of entries. An entry is reloaded as soon as the
+        modification time or size of its file changes.
+
+        Args:
+            max_bytes (int, optional): Memory budget of the cache. 0 disables caching. Defaults to 512 MiB.
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> (mtime_ns, file size, frame size, frame)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: str, loader: Callable[[str], pl.DataFrame] = pl.read_parquet) -> pl.DataFrame:
+        """
+        Returns the cached frame for path, or loads it with loader and caches it.
+
+        Args:
+            path (str): Path to the sample file.
+            loader (Callable, optional): Function loading the file. Defaults to pl.read_parquet.
+
+        Returns:
+            pl.DataFrame: The sample data.
+        """
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[3]
+            self.misses += 1
+
+        df = loader(path)
+        self._put(path, stat, df)
+        return df
+
+    def get_cached(self, path: str) -> pl.DataFrame | None:
+        """Returns the cached frame for path if it is cached and up to date, without loading it otherwise."""
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[3]
+            self.misses += 1
+            return None
+
+    def _put(self, path: str, stat: os.stat_result, df: pl.DataFrame):
+        frame_bytes = df.estimated_size()
+        with self._lock:
+            self._remove(path)
+            if frame_bytes > self.max_bytes:
+                return
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, frame_bytes, df)
+            self._total_bytes += frame_bytes
+            while self._total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, path: str):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+
+    def invalidate(self, path: str | None = None):
+        """Drops the entry for path, or all entries if no path is given."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._total_bytes = 0
+            else:
+                self._remove(path)
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss/eviction counters and the memory used by the cache.
+
+        Returns:
+            dict: Cache statistics.
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -1,27 +1,80 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 
 import polars as pl
 
+from fastTGA.models.dataset_layout import (LAYOUT_FILES, LAYOUT_HIVE, detect_layout, detect_storage_format,
+                                           sample_path, scan_hive_dataset, scan_sample, range_predicate, read_sample,
+                                           read_dataset_info, pyramid_directory, pyramid_path, count_rows)
+from fastTGA.models import metadata_log
+from fastTGA.models.derivatives import Derivative, METHOD_CENTRAL
+from fastTGA.models.id_index import IdIndex
 from fastTGA.services.data_filters import DataFilter
+from fastTGA.services.sample_cache import SampleFrameCache
 
 
 class SampleRepository:
-    def __init__(self, folder_path: str):
+    def __init__(self, folder_path: str, cache_max_bytes: int = 512 * 1024 ** 2, load_workers: int = 1):
         """
         Initializes the repository with the path to the folder.
         The folder must contain:
-          • metadata.parquet – A metadata file with an 'id' column and other sample info.
-          • sample_{id}.parquet – Files containing sample data, where {id} corresponds to the metadata 'id' value.
+          • metadata.parquet – A metadata file with an 'id' column and other sample info, possibly with
+            metadata_deltas/ of the append-only metadata storage (see fastTGA.models.metadata_log).
+          • sample_{id}.parquet – Files containing sample data, where {id} corresponds to the metadata 'id' value,
+            or alternatively a consolidated samples/id={id}/ dataset (see fastTGA.models.dataset_layout).
+            Datasets stored as Arrow IPC use .arrow files instead, which are read memory mapped.
+          • pyramid/{level}s/ – Optional downsampled copies of the sample files, see pyramid_level.
+
+        Loaded sample files are kept in an LRU cache bounded by memory, see cache_stats(). For uncompressed
+        Arrow IPC datasets a small cache is usually enough, since repeated reads are served by the OS page cache.
 
         Args:
             folder_path (str): Path to the folder.
+            cache_max_bytes (int, optional): Memory budget of the sample cache, 0 disables it. Defaults to 512 MiB.
+            load_workers (int, optional): Threads used by select and select_multiple to load samples, see
+                set_load_workers. Defaults to 1 (serial loading).
         """
         self.folder_path = folder_path
+        self.layout = detect_layout(folder_path) or LAYOUT_FILES
+        self.storage_format = detect_storage_format(folder_path)
+        self.pyramid_levels: List[float] = read_dataset_info(folder_path).get("pyramid", {}).get("levels", [])
         self.metadata_file = os.path.join(folder_path, "metadata.parquet")
-        self.metadata = pl.read_parquet(self.metadata_file)
+        self.metadata = metadata_log.read_table(folder_path, "metadata")
+        self.id_index = IdIndex(self.metadata["id"])
         self._filters: List[pl.Expr] = []
         self.data_filters: List[DataFilter] = []
+        self.derivatives: List[Derivative] = []
+        self.sample_cache = SampleFrameCache(cache_max_bytes)
+        self.load_workers = load_workers
+        self._load_timings: Dict[str, float] = {}
+
+    def set_load_workers(self, load_workers: int) -> "SampleRepository":
+        """
+        Sets the number of threads used by select and select_multiple. With more than one thread, parquet reads
+        and decompression of several samples overlap, which mostly helps on network or cloud-synced drives.
+        The order of the results does not depend on the number of threads.
+
+        Args:
+            load_workers (int): Number of loader threads.
+
+        Returns:
+            SampleRepository: Self instance to allow method chaining.
+        """
+        self.load_workers = max(1, int(load_workers))
+        return self
+
+    def load_timings(self) -> pl.DataFrame:
+        """
+        Returns the load time of every sample of the last select or select_multiple call.
+
+        Returns:
+            pl.DataFrame: Columns 'id' and 'load_s'.
+        """
+        return pl.DataFrame({"id": list(self._load_timings.keys()),
+                             "load_s": list(self._load_timings.values())},
+                            schema={"id": pl.Utf8, "load_s": pl.Float64})
 
     def filter(self, column: str, value, operator: str = None) -> "SampleRepository":
         """
@@ -100,12 +153,16 @@ class SampleRepository:
         Returns:
             pl.DataFrame: The metadata filtered according to the applied conditions.
         """
+        return self._filter_metadata(self.metadata)
+
+    def _filter_metadata(self, metadata: pl.DataFrame) -> pl.DataFrame:
+        """Applies all stored filters on the given metadata rows."""
         if self._filters:
             combined_expr = self._filters[0]
             for expr in self._filters[1:]:
                 combined_expr = combined_expr & expr
-            return self.metadata.filter(combined_expr)
-        return self.metadata
+            return metadata.filter(combined_expr)
+        return metadata
 
     def change_meta_column_type(self, column, to_type):
         # Change the type of a column in the metadata polars DataFrame.
@@ -113,24 +170,384 @@ class SampleRepository:
         self.metadata = self.metadata.with_columns(
             pl.col(column).cast(to_type)
         )
+        self.id_index.rebuild(self.metadata["id"])
 
-    def _get_sample_df(self, sample_id: str) -> pl.DataFrame:
+    def _get_sample_df(self, sample_id: str, predicate: pl.Expr | None = None,
+                       columns: List[str] = None, level_s: float | None = None) -> pl.DataFrame:
         """
         Loads and returns a sample DataFrame corresponding to the given sample_id.
 
+        If a predicate or columns are given, only the matching rows and the given columns are returned. Samples
+        that are not in the sample cache are then read with pl.scan_parquet, so unused columns are not read and
+        row groups excluded by the column statistics are never decompressed. Such partial reads are not cached.
+
         Args:
             sample_id (str): The value from the metadata 'id' column used to load the corresponding sample file.
+            predicate (pl.Expr, optional): Row filter evaluated while reading.
+            columns (List[str], optional): Columns to read.
+            level_s (float, optional): Read this pyramid level instead of the full resolution data.
 
         Returns:
-            pl.DataFrame: The sample data loaded from its parquet file.
+            pl.DataFrame: The sample data loaded from its parquet file, or from the sample cache.
 
         Raises:
             FileNotFoundError: If the sample file does not exist.
         """
-        sample_path = os.path.join(self.folder_path, f"sample_{sample_id}.parquet")
-        if not os.path.exists(sample_path):
-            raise FileNotFoundError(f"Sample file not found: {sample_path}")
-        return pl.read_parquet(sample_path)
+        path = pyramid_path(self.folder_path, sample_id, level_s, self.layout, self.storage_format)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Sample file not found: {path}")
+        if predicate is None and columns is None:
+            return self.sample_cache.get(path, loader=read_sample)
+
+        cached = self.sample_cache.get_cached(path)
+        if cached is None:
+            return read_sample(path, columns, predicate)
+        if predicate is not None:
+            cached = cached.filter(predicate)
+        return cached.select(columns) if columns is not None else cached
+
+    def scan(self, metadata_columns: List[str] = None, level_s: float | None = None) -> pl.LazyFrame:
+        """
+        Returns one LazyFrame over all samples in the (filtered) metadata, with an 'id' column.
+        Time matching (see match_time_column_for_temperature), derivatives (see add_derivative) and the
+        registered data filters are part of the same lazy plan, so polars can parallelize the work, skip columns
+        that are not needed and, without time matching or derivatives, push the data filter predicate into the
+        parquet scan:
+
+            repo.filter("Sample Condition", "Washed").match_time_column_for_temperature(600)
+            df = repo.scan(metadata_columns=["Sample"]).select("id", "Sample", "t_s", "dm_mg").collect()
+
+        Samples are read with pl.scan_parquet and bypass the sample cache. Data filters without an expression
+        (see DataFilter.expr) must accept a LazyFrame in apply to be used here.
+
+        Args:
+            metadata_columns (List[str], optional): Metadata columns joined to every row by 'id'.
+            level_s (float, optional): Scan this pyramid level instead of the full resolution data,
+                e.g. repo.scan(level_s=repo.pyramid_level(points=2000)).
+
+        Returns:
+            pl.LazyFrame: The (adjusted and filtered) data of all selected samples.
+        """
+        lf = self.scan_samples(level_s=level_s)
+        if not lf.collect_schema().names():
+            return lf
+
+        if getattr(self, "_time_matching_settings", None):
+            lf = self.align_time(lf, **self._time_matching_settings)
+        for derivative in self.derivatives:
+            lf = derivative.apply(lf, group="id")
+
+        predicate, remaining_filters = self._split_data_filters()
+        if predicate is not None:
+            lf = lf.filter(predicate)
+        lf = self._apply_data_filters(lf, remaining_filters)
+
+        if metadata_columns:
+            metadata = (self._get_filtered_metadata().lazy()
+                        .select(["id", *[c for c in metadata_columns if c != "id"]])
+                        .with_columns(pl.col("id").cast(pl.Utf8)))
+            lf = lf.join(metadata, on="id", how="left")
+        return lf
+
+    def resample(self, grid, on: str = "t_s", columns: List[str] = None) -> pl.DataFrame:
+        """
+        Resamples all selected samples (see scan, including time matching and data filters) onto a shared grid
+        by linear interpolation, in one pass over the concatenated data. Grid points outside the range of a
+        sample are null, nothing is extrapolated.
+
+        Args:
+            grid (float | List[float]): The grid values, or the grid step spanning the range of all samples.
+            on (str, optional): The grid column, e.g. "t_s" or "T_C". It must increase within every sample,
+                so for a temperature grid use a monotonic segment (e.g. a T_C / t_s window filter). Defaults to "t_s".
+            columns (List[str], optional): Columns to interpolate. Defaults to all other numeric columns.
+
+        Returns:
+            pl.DataFrame: Columns 'id', on and the interpolated columns, one row per sample and grid point.
+        """
+        lf = self.scan()
+        schema = lf.collect_schema()
+        if not schema.names():
+            return pl.DataFrame()
+        if columns is None:
+            columns = [c for c, dtype in schema.items() if c not in ("id", on) and dtype.is_numeric()]
+
+        data = lf.select("id", on, *columns).drop_nulls(on).with_columns(pl.col(on).cast(pl.Float64))
+        grid_values = self._grid_values(grid, data, on)
+        grid_lf = (data.select("id").unique()
+                   .join(pl.LazyFrame({on: grid_values}, schema={on: pl.Float64}), how="cross")
+                   .sort(on))
+
+        # the enclosing data points of every grid point, found with two as-of joins per sample
+        def neighbours(suffix, strategy):
+            points = data.select("id", pl.col(on).alias(f"_x{suffix}"),
+                                 *[pl.col(c).alias(f"_{c}{suffix}") for c in columns]).sort(f"_x{suffix}")
+            return points, dict(left_on=on, right_on=f"_x{suffix}", by="id", strategy=strategy,
+                                check_sortedness=False)
+
+        below, below_args = neighbours("0", "backward")
+        above, above_args = neighbours("1", "forward")
+        joined = grid_lf.join_asof(below, **below_args).join_asof(above, **above_args)
+
+        x, x0, x1 = pl.col(on), pl.col("_x0"), pl.col("_x1")
+        weight = pl.when(x1 == x0).then(0.0).otherwise((x - x0) / (x1 - x0))
+        return (joined
+                .select("id", on, *[(pl.col(f"_{c}0") + weight * (pl.col(f"_{c}1") - pl.col(f"_{c}0"))).alias(c)
+                                    for c in columns])
+                .sort("id", on)
+                .collect())
+
+    @staticmethod
+    def _grid_values(grid, data: pl.LazyFrame, on: str) -> pl.Series:
+        if not isinstance(grid, (int, float)):
+            return pl.Series(on, grid, dtype=pl.Float64)
+        if grid <= 0:
+            raise ValueError(f"Grid step must be positive: {grid}")
+        bounds = data.select(pl.col(on).min().alias("start"), pl.col(on).max().alias("stop")).collect()
+        start, stop = bounds["start"][0], bounds["stop"][0]
+        if start is None:
+            return pl.Series(on, [], dtype=pl.Float64)
+        n = int((stop - start) // grid) + 1
+        return pl.select(start + grid * pl.int_range(n, eager=False)).to_series().alias(on)
+
+    def aggregate_replicates(self, grid, group_by: str | List[str] = None, on: str = "t_s",
+                             columns: List[str] = None) -> pl.DataFrame:
+        """
+        Resamples all selected samples onto a shared grid (see resample) and aggregates the replicates of every
+        group of metadata values into mean/std/min/max bands, e.g. to plot hundreds of runs at once:
+
+            repo.match_time_column_for_temperature(600)
+            bands = repo.aggregate_replicates(grid=10, group_by="Sample Condition", columns=["dm_mg"])
+
+        Args:
+            grid (float | List[float]): The grid values, or the grid step, see resample.
+            group_by (str | List[str], optional): Metadata columns defining the groups. Without it all selected
+                samples form one group.
+            on (str, optional): The grid column. Defaults to "t_s".
+            columns (List[str], optional): Columns to aggregate. Defaults to all other numeric columns.
+
+        Returns:
+            pl.DataFrame: One row per group and grid point with the columns {column}_mean, {column}_std,
+                {column}_min and {column}_max, and 'n', the number of samples with data at the grid point.
+        """
+        group_by = [group_by] if isinstance(group_by, str) else list(group_by or [])
+        resampled = self.resample(grid, on, columns)
+        if resampled.is_empty():
+            return resampled
+        columns = [c for c in resampled.columns if c not in ("id", on)]
+
+        if group_by:
+            metadata = (self._get_filtered_metadata()
+                        .select("id", *group_by)
+                        .with_columns(pl.col("id").cast(pl.Utf8)))
+            resampled = resampled.join(metadata, on="id", how="left")
+
+        stats = []
+        for c in columns:
+            stats += [pl.col(c).mean().alias(f"{c}_mean"), pl.col(c).std().alias(f"{c}_std"),
+                      pl.col(c).min().alias(f"{c}_min"), pl.col(c).max().alias(f"{c}_max")]
+        has_data = pl.any_horizontal([pl.col(c).is_not_null() for c in columns])
+        return (resampled
+                .group_by(*group_by, on)
+                .agg(*stats, has_data.sum().cast(pl.UInt32).alias("n"))
+                .sort(*group_by, on))
+
+    @staticmethod
+    def conversion(mass_column: str = "dm_mg", start: tuple = None, end: tuple = None, segment_column: str = "t_s",
+                   group: str | None = "id") -> pl.Expr:
+        """
+        Expression for the conversion alpha = (m0 - m) / (m0 - m_end) of every row, named 'alpha'. It is null
+        for samples whose start and end mass are equal.
+
+        Args:
+            mass_column (str, optional): The mass column. Defaults to "dm_mg".
+            start (tuple, optional): (low, high) window of segment_column, inclusive, either bound may be None.
+                m0 is the mean mass in it. Defaults to the mass of the first row.
+            end (tuple, optional): The window m_end is averaged over. Defaults to the mass of the last row.
+            segment_column (str, optional): The column of the start and end windows, e.g. "t_s" or "T_C".
+                Defaults to "t_s".
+            group (str, optional): Column identifying the samples. None treats the frame as a single sample.
+        """
+        mass = pl.col(mass_column)
+
+        def segment_mass(bounds, default):
+            if bounds is None:
+                return default
+            low, high = bounds
+            inside = pl.lit(True)
+            if low is not None:
+                inside = inside & (pl.col(segment_column) >= low)
+            if high is not None:
+                inside = inside & (pl.col(segment_column) <= high)
+            return mass.filter(inside).mean()
+
+        m0 = segment_mass(start, mass.first())
+        m_end = segment_mass(end, mass.last())
+        if group is not None:
+            m0, m_end = m0.over(group), m_end.over(group)
+        return pl.when(m0 != m_end).then((m0 - mass) / (m0 - m_end)).alias("alpha")
+
+    def scan_conversion(self, mass_column: str = "dm_mg", start: tuple = None, end: tuple = None,
+                        segment_column: str = "t_s") -> pl.LazyFrame:
+        """
+        scan() with the conversion alpha of every row of every selected sample, see conversion.
+        The start and end mass are taken from the data after time matching and data filters.
+        """
+        lf = self.scan()
+        if not lf.collect_schema().names():
+            return lf
+        return lf.with_columns(self.conversion(mass_column, start, end, segment_column))
+
+    def alpha_table(self, alphas: List[float] = None, mass_column: str = "dm_mg", start: tuple = None,
+                    end: tuple = None, segment_column: str = "t_s", time_column: str = "t_s",
+                    temperature_column: str = "T_C") -> pl.DataFrame:
+        """
+        Time and temperature at which every selected sample reaches fixed conversion levels, e.g. for
+        isoconversional kinetics. All samples are interpolated in one pass, with an as-of join per level:
+
+            repo.filter("Sample Condition", "Washed")
+            table = repo.alpha_table(start=(0, 300), end=(None, None), segment_column="T_C")
+
+        A level is reached at the first time alpha gets to it (noise that lowers alpha again is ignored),
+        time and temperature are interpolated linearly between that row and the one before. Levels a sample
+        never reaches are null.
+
+        Args:
+            alphas (List[float], optional): The conversion levels. Defaults to 0.05, 0.10, ..., 0.95.
+            mass_column, start, end, segment_column: The definition of alpha, see conversion.
+            time_column (str, optional): The time column to interpolate. Defaults to "t_s".
+            temperature_column (str, optional): The temperature column to interpolate. Defaults to "T_C".
+
+        Returns:
+            pl.DataFrame: Columns 'id', 'alpha', time_column and temperature_column, one row per sample and level.
+        """
+        lf = self.scan()
+        if not lf.collect_schema().names():
+            return pl.DataFrame()
+        if alphas is None:
+            alphas = [round(0.05 * i, 2) for i in range(1, 20)]
+
+        # the running maximum of alpha increases within every sample, as the as-of join requires
+        reached = pl.col("alpha").cum_max()
+        data = (lf.select("id", time_column, temperature_column,
+                          self.conversion(mass_column, start, end, segment_column))
+                .drop_nulls("alpha")
+                .with_columns(reached.over("id").alias("_alpha1"))
+                .with_columns(pl.col("_alpha1").shift(1).over("id").alias("_alpha0"),
+                              *[pl.col(c).shift(1).over("id").alias(f"_{c}0")
+                                for c in (time_column, temperature_column)])
+                .sort("_alpha1", maintain_order=True))
+        levels = (data.select("id").unique()
+                  .join(pl.LazyFrame({"alpha": alphas}, schema={"alpha": pl.Float64}), how="cross")
+                  .sort("alpha"))
+        joined = levels.join_asof(data.drop("alpha"), left_on="alpha", right_on="_alpha1", by="id",
+                                  strategy="forward", check_sortedness=False)
+
+        a0, a1 = pl.col("_alpha0"), pl.col("_alpha1")
+        weight = pl.when(a0.is_null()).then(1.0).otherwise((pl.col("alpha") - a0) / (a1 - a0))
+
+        def interpolate(column):
+            below = pl.coalesce(pl.col(f"_{column}0"), pl.col(column))
+            return (below + weight * (pl.col(column) - below)).alias(column)
+
+        return (joined
+                .select("id", "alpha", interpolate(time_column), interpolate(temperature_column))
+                .sort("id", "alpha")
+                .collect())
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Returns hit/miss/eviction counters and the memory used by the sample cache.
+
+        Returns:
+            Dict[str, Any]: Cache statistics.
+        """
+        return self.sample_cache.stats()
+
+    def scan_samples(self, sample_ids: List[str] = None, level_s: float | None = None) -> pl.LazyFrame:
+        """
+        Returns one LazyFrame over the raw sample data of all samples in the (filtered) metadata,
+        with an additional 'id' column. Time matching and data filters are not applied.
+
+        On the consolidated layout this is a single scan of the hive partitioned dataset, so polars prunes
+        partitions by id and pushes projections and predicates on data columns into the parquet reader, e.g.:
+
+            repo.filter("Sample Condition", "Washed")
+            repo.scan_samples().filter(pl.col("T_C").is_between(600, 700)).select("id", "t_s", "T_C").collect()
+
+        Args:
+            sample_ids (List[str], optional): Scan these samples instead of the ones in the filtered metadata.
+            level_s (float, optional): Scan this pyramid level instead of the full resolution data.
+
+        Returns:
+            pl.LazyFrame: The sample data of all selected samples.
+        """
+        if sample_ids is None:
+            sample_ids = self._get_filtered_metadata()["id"]
+        ids = [str(i) for i in sample_ids]
+
+        if self.layout == LAYOUT_HIVE:
+            folder_path = self.folder_path if level_s is None else pyramid_directory(self.folder_path, level_s)
+            return scan_hive_dataset(folder_path, self.storage_format).filter(pl.col("id").is_in(ids))
+
+        frames = []
+        for sample_id in ids:
+            path = pyramid_path(self.folder_path, sample_id, level_s, self.layout, self.storage_format)
+            if not os.path.exists(path):
+                print(f"Warning: Sample file for id '{sample_id}' not found. Skipping.")
+                continue
+            frames.append(scan_sample(path).with_columns(pl.lit(sample_id).alias("id")))
+        if not frames:
+            return pl.LazyFrame()
+        return pl.concat(frames, how="diagonal_relaxed")
+
+    def pyramid_level(self, sample_id: str = None, points: int = None, resolution_s: float = None,
+                      t_range: tuple = None, T_range: tuple = None) -> float | None:
+        """
+        Picks the pyramid level (see TGADatasetModel.set_pyramid) to read for a point budget or a time resolution:
+
+            level = repo.pyramid_level(points=2000)
+            df = repo.scan(level_s=level).collect()  # at most about 2000 rows per sample
+
+        With points it is the finest level at which no sample has more than points rows (in the t_range /
+        T_range window), or the coarsest level if none does. With resolution_s it is the coarsest level with
+        at most resolution_s seconds per row. Levels that were not written for every sample are skipped.
+
+        Args:
+            sample_id (str, optional): Pick the level for this sample. Defaults to all samples in the filtered metadata.
+            points (int, optional): Maximum number of rows per sample.
+            resolution_s (float, optional): Maximum seconds per row.
+            t_range, T_range: The window the rows are counted in, see select_single.
+
+        Returns:
+            float | None: Seconds per row of the level, None for the full resolution data.
+        """
+        if (points is None) == (resolution_s is None):
+            raise ValueError("Give either points or resolution_s")
+
+        sample_ids = [sample_id] if sample_id is not None else self._get_filtered_metadata()["id"]
+        ids = [str(i) for i in sample_ids
+               if os.path.exists(sample_path(self.folder_path, str(i), self.layout, self.storage_format))]
+
+        def paths(level_s):
+            level_paths = [pyramid_path(self.folder_path, i, level_s, self.layout, self.storage_format) for i in ids]
+            return level_paths if all(os.path.exists(path) for path in level_paths) else None
+
+        if resolution_s is not None:
+            for level_s in reversed([level for level in self.pyramid_levels if level <= resolution_s]):
+                if paths(level_s) is not None:
+                    return level_s
+            return None
+
+        window = range_predicate(t_range, T_range)
+        chosen = None
+        for level_s in [None, *self.pyramid_levels]:
+            level_paths = paths(level_s)
+            if level_paths is None:
+                continue
+            chosen = level_s
+            if max((count_rows(path, window) for path in level_paths), default=0) <= points:
+                break
+        return chosen
 
     def head(self, n: int = 5) -> pl.DataFrame:
         """
@@ -188,91 +605,204 @@ class SampleRepository:
             self,
             target_temperature: float,
             time_column: str = "t_s",
-            temperature_column: str = "T_C"
+            temperature_column: str = "T_C",
+            crossing: str = "nearest",
+            interpolate: bool = False
     ) -> "SampleRepository":
         """
         Sets the time matching settings for the repository so that subsequent sample loading
-        (via select_single, select_multiple, or select) will adjust the sample DataFrames such that
+        (via select_single, select_multiple, select or scan) will adjust the sample DataFrames such that
         the new time column (time_column) is shifted so that t_s = 0 is at the moment when the temperature
-        (temperature_column) is closest to target_temperature.
+        (temperature_column) reaches target_temperature, see align_time.
 
         Args:
             target_temperature (float): The target temperature used to align the time columns.
             time_column (str, optional): The name of the new time column to store the shifted time. Default is "t_s".
             temperature_column (str, optional): The name of the temperature column in the sample data. Default is "T_C".
+            crossing (str, optional): "nearest" (the row closest to the target temperature), "first" or "last"
+                (the first or last time the temperature crosses the target). Default is "nearest".
+            interpolate (bool, optional): Interpolate the crossing time linearly between the two rows enclosing
+                the target temperature instead of using the time of a row. Default is False.
 
         Returns:
             SampleRepository: The repository instance (for potential method chaining).
         """
+        if crossing not in {"nearest", "first", "last"}:
+            raise ValueError(f"Unsupported crossing: {crossing}")
         self._time_matching_settings = {
             "target_temperature": target_temperature,
             "time_column": time_column,
             "temperature_column": temperature_column,
+            "crossing": crossing,
+            "interpolate": interpolate,
         }
         return self
 
-    def _adjust_time_column(
-            self,
-            sample_df: pl.DataFrame,
+    def add_derivative(self, y: str = "dm_mg", x: str = "t_s", method: str = METHOD_CENTRAL, window: int = 11,
+                       polyorder: int = 2, alias: str = None) -> "SampleRepository":
+        """
+        Adds a derivative column (see fastTGA.models.derivatives.Derivative) to every sample loaded with
+        select_single, select_multiple, select or scan, e.g. a smoothed DTG curve or dm/dT:
+
+            repo.add_derivative(method="savgol", window=21).add_derivative(x="T_C")
+
+        Derivatives are computed on the complete sample, after the time matching and before the data filters
+        and the t_range / T_range window.
+
+        Args:
+            y (str, optional): The column to differentiate. Defaults to "dm_mg".
+            x (str, optional): The column to differentiate against. Defaults to "t_s".
+            method (str, optional): "central", "savgol" or "regression". Defaults to "central".
+            window (int, optional): Rows per window of "savgol" and "regression", odd. Defaults to 11.
+            polyorder (int, optional): Degree of the "savgol" polynomial. Defaults to 2.
+            alias (str, optional): Name of the new column. Defaults to "dmdt_mg_s" / "dmdT_mg_C" for dm_mg.
+
+        Returns:
+            SampleRepository: self, for method chaining.
+        """
+        self.derivatives.append(Derivative(y, x, method, window, polyorder, alias))
+        return self
+
+    def reset_derivatives(self) -> "SampleRepository":
+        self.derivatives = []
+        return self
+
+    @staticmethod
+    def time_at_temperature(
             target_temperature: float,
             time_column: str = "t_s",
-            temperature_column: str = "T_C"
-    ) -> pl.DataFrame:
-        """
-        Adjusts the time column in a given sample DataFrame based on a target temperature.
+            temperature_column: str = "T_C",
+            crossing: str = "nearest",
+            interpolate: bool = False
+    ) -> pl.Expr:
+        """
+        Expression evaluating to the time at which a sample reaches target_temperature, e.g. in
+        df.group_by("id").agg(SampleRepository.time_at_temperature(600)). The rows must be sorted by time.
+
+        A crossing lies between two consecutive rows whose temperatures enclose the target. If the temperature
+        never crosses the target, the time of the row closest to the target is used for every crossing option.
+        See match_time_column_for_temperature for crossing and interpolate.
+        """
+        time = pl.col(time_column)
+        deviation = pl.col(temperature_column) - target_temperature
+        next_deviation = deviation.shift(-1)
+        next_time = time.shift(-1)
+
+        time_at_nearest_row = time.get(deviation.abs().arg_min())
+        if crossing == "nearest" and not interpolate:
+            return time_at_nearest_row
+
+        is_crossing = (deviation * next_deviation <= 0) & next_deviation.is_not_null()
+        if interpolate:
+            fraction = (-deviation / (next_deviation - deviation)).fill_nan(0.0)
+            crossing_time = time + fraction * (next_time - time)
+        else:
+            crossing_time = pl.when(deviation.abs() <= next_deviation.abs()).then(time).otherwise(next_time)
 
-        It finds the row where the temperature (from temperature_column) is closest to the target_temperature,
-        then computes a new time shift such that t_s=0 at that row. A new column 't_s' is appended to the DataFrame,
-        which equals (original time - time at closest temperature).
+        crossing_times = crossing_time.filter(is_crossing)
+        if crossing == "first":
+            time_at_crossing = crossing_times.first()
+        elif crossing == "last":
+            time_at_crossing = crossing_times.last()
+        else:
+            pair_deviation = pl.min_horizontal(deviation.abs(), next_deviation.abs()).filter(is_crossing)
+            time_at_crossing = crossing_times.sort_by(pair_deviation).first()
+        return pl.coalesce(time_at_crossing, time_at_nearest_row)
+
+    @classmethod
+    def align_time(
+            cls,
+            df: pl.DataFrame | pl.LazyFrame,
+            target_temperature: float,
+            time_column: str = "t_s",
+            temperature_column: str = "T_C",
+            crossing: str = "nearest",
+            interpolate: bool = False,
+            group: str | None = "id"
+    ) -> pl.DataFrame | pl.LazyFrame:
+        """
+        Shifts the time of every sample of a concatenated multi-sample frame so that t_s = 0 when the sample
+        reaches target_temperature (see time_at_temperature). The crossing time is computed per group as one
+        window expression and subtracted in the same pass, without a loop over the samples.
 
         Args:
-            sample_df (pl.DataFrame): The sample DataFrame.
+            df (pl.DataFrame | pl.LazyFrame): Sample data, sorted by time within every group.
             target_temperature (float): The target temperature value.
-            time_column (str, optional): Name of the time column. Defaults to "time".
-            temperature_column (str, optional): Name of the temperature column. Defaults to "temperature".
+            time_column, temperature_column, crossing, interpolate: See match_time_column_for_temperature.
+            group (str, optional): Column identifying the samples. None aligns df as a single sample.
 
         Returns:
-            pl.DataFrame: A new DataFrame with an added 't_s' column.
+            pl.DataFrame | pl.LazyFrame: df with the shifted 't_s' column.
         """
-        # Compute the absolute difference between the temperature values and the target temperature.
-        diff_series = (sample_df[temperature_column] - target_temperature).abs()
+        anchor = cls.time_at_temperature(target_temperature, time_column, temperature_column, crossing, interpolate)
+        if group is not None:
+            anchor = anchor.over(group)
+        return df.with_columns((pl.col(time_column) - anchor).alias("t_s"))
 
-        # Find the index (row) at which this difference is minimal.
-        idx = diff_series.arg_min()
-
-        # Get the time value at this index in order to use it as a shift anchor.
-        time_at_target = sample_df[time_column][idx]
+    def _adjust_time_column(
+            self,
+            sample_df: pl.DataFrame,
+            target_temperature: float,
+            time_column: str = "t_s",
+            temperature_column: str = "T_C",
+            crossing: str = "nearest",
+            interpolate: bool = False
+    ) -> pl.DataFrame:
+        """
+        Adjusts the time column in a given sample DataFrame based on a target temperature, see align_time.
 
-        # Create a new DataFrame with an additional column "t_s" for the shifted time.
-        adjusted_df = sample_df.with_columns((pl.col(time_column) - time_at_target).alias("t_s"))
-        return adjusted_df
+        Returns:
+            pl.DataFrame: A new DataFrame with an added 't_s' column.
+        """
+        return self.align_time(sample_df, target_temperature, time_column, temperature_column,
+                               crossing, interpolate, group=None)
 
-    def _load_sample_df(self, sample_id: str) -> pl.DataFrame:
+    def _load_sample_df(self, sample_id: str, columns: List[str] = None, t_range: tuple = None,
+                        T_range: tuple = None, level_s: float | None = None) -> pl.DataFrame:
         """
         Loads a sample DataFrame based on its id and applies the time column adjustment
-        if time matching settings have been configured (via match_time_column_for_temperature).
+        if time matching settings have been configured (via match_time_column_for_temperature)
+        and the derivatives added with add_derivative.
 
         Args:
             sample_id (str): The sample identifier.
+            columns (List[str], optional): Only return these columns.
+            t_range (tuple, optional): Only return rows with t_s in (start, end), after the time adjustment.
+            T_range (tuple, optional): Only return rows with T_C in (start, end).
+            level_s (float, optional): Load this pyramid level instead of the full resolution data.
 
         Returns:
             pl.DataFrame: The (possibly) adjusted sample DataFrame.
         """
-        sample_df = self._get_sample_df(sample_id)
-        # If time matching settings have been applied, adjust the time column:
-        if hasattr(self, "_time_matching_settings") and self._time_matching_settings:
-            s = self._time_matching_settings
-            sample_df = self._adjust_time_column(
-                sample_df,
-                s["target_temperature"],
-                s["time_column"],
-                s["temperature_column"]
-            )
-        sample_df = self._apply_data_filters(sample_df)
-        return sample_df
+        time_matching = getattr(self, "_time_matching_settings", None)
+        window = range_predicate(t_range, T_range)
+
+        # The filters may only run before the time adjustment if there is none, since the adjustment looks
+        # for the row closest to the target temperature in the complete sample. Derivatives likewise need
+        # the neighbouring rows the filters would remove.
+        if time_matching or self.derivatives:
+            sample_df = self._get_sample_df(sample_id, level_s=level_s)
+            if time_matching:
+                sample_df = self._adjust_time_column(sample_df, **time_matching)
+            for derivative in self.derivatives:
+                sample_df = derivative.apply(sample_df)
+            sample_df = self._apply_data_filters(sample_df)
+            if window is not None:
+                sample_df = sample_df.filter(window)
+        else:
+            predicate, remaining_filters = self._split_data_filters()
+            if window is not None:
+                predicate = window if predicate is None else predicate & window
+            # filters running through apply may need any column, so the projection waits for them
+            sample_df = self._get_sample_df(sample_id, predicate=predicate,
+                                            columns=None if remaining_filters else columns, level_s=level_s)
+            sample_df = self._apply_data_filters(sample_df, remaining_filters)
+
+        return sample_df.select(columns) if columns is not None else sample_df
 
     # Updated select_single to use _load_sample_df instead of _get_sample_df:
-    def select_single(self, sample_id: str) -> pl.DataFrame:
+    def select_single(self, sample_id: str, columns: List[str] = None, t_range: tuple = None,
+                      T_range: tuple = None, points: int = None, resolution_s: float = None) -> pl.DataFrame:
         """
         Returns a single sample DataFrame for the given sample_id if it exists in the (filtered) metadata.
         If the repository was configured to adjust the time column (via match_time_column_for_temperature),
@@ -280,14 +810,27 @@ class SampleRepository:
 
         Args:
             sample_id (str): The sample id to select.
+            columns (List[str], optional): Only load these columns.
+            t_range (tuple, optional): Only load rows with t_s in (start, end), either bound may be None.
+            T_range (tuple, optional): Only load rows with T_C in (start, end), either bound may be None.
+            points (int, optional): Load the pyramid level with at most this many rows, see pyramid_level.
+            resolution_s (float, optional): Load the coarsest pyramid level with at most this many seconds per row.
 
         Returns:
             pl.DataFrame: Sample data or None if not found.
         """
-        filtered = self._get_filtered_metadata().filter(pl.col("id") == sample_id)
+        filtered = self._filter_metadata(self.id_index.take(self.metadata, [sample_id]))
         if filtered.height == 0:
             return None
-        return self._load_sample_df(str(sample_id))
+        level_s = self._level_for(str(sample_id), points, resolution_s, t_range, T_range)
+        return self._load_sample_df(str(sample_id), columns, t_range, T_range, level_s)
+
+    def _level_for(self, sample_id: str, points: int | None, resolution_s: float | None, t_range: tuple | None,
+                   T_range: tuple | None) -> float | None:
+        """The pyramid level of a sample for select, None (full resolution) without points and resolution_s."""
+        if points is None and resolution_s is None:
+            return None
+        return self.pyramid_level(sample_id, points, resolution_s, t_range, T_range)
 
     def get_metadata_for_id(self, sample_id: str) -> dict:
         """
@@ -299,54 +842,102 @@ class SampleRepository:
         Returns:
             pl.DataFrame: The metadata row for the given sample id.
         """
-        return self.metadata.filter(pl.col("id") == sample_id).to_dict()
+        return self.id_index.take(self.metadata, [sample_id]).to_dict()
 
     # Updated select_multiple to use _load_sample_df:
-    def select_multiple(self, key: str, values: List[str]) -> List[Dict[str, Any]]:
+    def select_multiple(self, key: str, values: List[str], columns: List[str] = None, t_range: tuple = None,
+                        T_range: tuple = None, points: int = None,
+                        resolution_s: float = None) -> List[Dict[str, Any]]:
         """
         For each value in `values`, if a matching row is found in the (filtered) metadata (using the provided key),
         then the corresponding sample file is loaded and adjusted (if matching settings exist).
+        Ids are looked up in the id index, other keys with a single is_in filter over the metadata.
 
         Args:
             key (str): The column name in the metadata to search (typically "id").
             values (List[str]): List of values to look up.
+            columns, t_range, T_range: Projection of the loaded samples, see select_single.
+            points, resolution_s: Pyramid level of every sample, see select_single.
 
         Returns:
             List[Dict[str, Any]]: A list of dictionaries with keys "id" and "data".
         """
-        results = []
-        filtered = self._get_filtered_metadata()
-        for val in values:
-            if filtered.filter(pl.col(key) == val).height > 0:
-                sample_df = self._load_sample_df(str(val))
-                results.append({"id": val, "data": sample_df})
-        return results
+        if key == "id":
+            matched = {str(i) for i in self._filter_metadata(self.id_index.take(self.metadata, values))["id"]}
+            found = [val for val in values if str(val) in matched]
+        else:
+            matched = set(self._get_filtered_metadata().filter(pl.col(key).is_in(values))[key].to_list())
+            found = [val for val in values if val in matched]
+        return self._load_samples(found, skip_missing=False, columns=columns, t_range=t_range, T_range=T_range,
+                                  points=points, resolution_s=resolution_s)
 
 
 # Updated select to use _load_sample_df:
-    def select(self) -> List[Dict[str, Any]]:
+    def select(self, columns: List[str] = None, t_range: tuple = None, T_range: tuple = None,
+               points: int = None, resolution_s: float = None) -> List[Dict[str, Any]]:
         """
         Iterates over the filtered metadata rows, loads each corresponding sample DataFrame (applying
         time column adjustments if match_time_column_for_temperature was previously called), and returns
         a list of dictionaries with keys "id" and "data".
 
+        Args:
+            columns, t_range, T_range: Projection of the loaded samples, see select_single.
+            points, resolution_s: Pyramid level of every sample, see select_single. For an overview of many
+                samples, e.g. select(points=2000), every sample is read at the finest level within the budget.
+
         Returns:
             List[Dict[str, Any]]: List of dictionaries containing sample ids and their (adjusted) data.
         """
-        results = []
         filtered = self._get_filtered_metadata()
         id_col = "id"
 
         if id_col not in filtered.columns:
             raise KeyError(f"Metadata does not contain expected '{id_col}' column.")
 
-        # Iterate over the sample ids in the filtered metadata
-        for sample_id in filtered[id_col]:
+        # Load the sample ids in the filtered metadata
+        return self._load_samples(list(filtered[id_col]), skip_missing=True, columns=columns, t_range=t_range,
+                                  T_range=T_range, points=points, resolution_s=resolution_s)
+
+    def _load_samples(self, sample_ids: List[Any], skip_missing: bool, columns: List[str] = None,
+                      t_range: tuple = None, T_range: tuple = None, points: int = None,
+                      resolution_s: float = None) -> List[Dict[str, Any]]:
+        """
+        Loads the given samples, using a thread pool if load_workers > 1. Results keep the order of sample_ids.
+
+        Args:
+            sample_ids (List[Any]): The sample ids to load.
+            skip_missing (bool): Skip missing sample files with a warning instead of raising FileNotFoundError.
+            columns, t_range, T_range: Projection of the loaded samples, see select_single.
+            points, resolution_s: Pyramid level of every sample, see select_single.
+
+        Returns:
+            List[Dict[str, Any]]: List of dictionaries with keys "id" and "data".
+        """
+        def load(sample_id):
+            start = time.perf_counter()
             try:
-                adjusted_df = self._load_sample_df(str(sample_id))
-                results.append({"id": sample_id, "data": adjusted_df})
+                level_s = self._level_for(str(sample_id), points, resolution_s, t_range, T_range)
+                sample_df = self._load_sample_df(str(sample_id), columns, t_range, T_range, level_s)
             except FileNotFoundError:
+                if not skip_missing:
+                    raise
+                sample_df = None
+            return sample_id, sample_df, time.perf_counter() - start
+
+        if self.load_workers > 1 and len(sample_ids) > 1:
+            with ThreadPoolExecutor(max_workers=self.load_workers) as executor:
+                loaded = list(executor.map(load, sample_ids))
+        else:
+            loaded = [load(sample_id) for sample_id in sample_ids]
+
+        self._load_timings = {str(sample_id): seconds for sample_id, _, seconds in loaded}
+
+        results = []
+        for sample_id, sample_df, _ in loaded:
+            if sample_df is None:
                 print(f"Warning: Sample file for id '{sample_id}' not found. Skipping.")
+                continue
+            results.append({"id": sample_id, "data": sample_df})
         return results
 
     def data_filter(self, data_filter: DataFilter) -> "SampleRepository":
@@ -363,11 +954,30 @@ class SampleRepository:
         self.data_filters.append(data_filter)
         return self
 
-    def _apply_data_filters(self, df: pl.DataFrame) -> pl.DataFrame:
+    def _split_data_filters(self) -> tuple[pl.Expr | None, List[DataFilter]]:
+        """
+        Combines the leading data filters that provide an expression (DataFilter.expr) into one predicate.
+        The remaining filters, starting with the first one without an expression, keep running through apply
+        in their registration order.
+
+        Returns:
+            tuple[pl.Expr | None, List[DataFilter]]: The combined predicate and the remaining filters.
+        """
+        predicate = None
+        for i, filt in enumerate(self.data_filters):
+            expr = filt.expr()
+            if expr is None:
+                return predicate, self.data_filters[i:]
+            predicate = expr if predicate is None else predicate & expr
+        return predicate, []
+
+    def _apply_data_filters(self, df: pl.DataFrame | pl.LazyFrame,
+                            data_filters: List[DataFilter] = None) -> pl.DataFrame | pl.LazyFrame:
         """
-        Passes the sample DataFrame sequentially through all registered data filters.
+        Passes the sample DataFrame (or the LazyFrame of scan) sequentially through all registered data filters,
+        or through the given ones.
         """
-        for filt in self.data_filters:
+        for filt in self.data_filters if data_filters is None else data_filters:
             df = filt.apply(df)
         return df
 
@@ -1,41 +1,125 @@
+import copy
+
+from fastTGA.models.derivatives import Derivative, METHOD_CENTRAL
+from fastTGA.models.downsampling import Downsampler, make_downsampler
 from fastTGA.models.google_spreadsheet_model import GoogleSpreadsheetModel
 from fastTGA.models.tga_file import TGAFile
+from fastTGA.services.parse_cache import TGAParseCache
 
 
 class TGAEntryPreparator:
 
-    def __init__(self, config):
+    def __init__(self, config, parse_cache: TGAParseCache | None = None):
         self.config = config or {}
+        self.parse_cache = parse_cache
+
 
+    def copy(self) -> "TGAEntryPreparator":
+        """A preparator with a copy of the config, sharing the parse cache."""
+        return TGAEntryPreparator(copy.deepcopy(self.config), parse_cache=self.parse_cache)
 
     def prepare_entry_data(self, tga_file_dict, gspread_model: GoogleSpreadsheetModel):
         """
-        1. Create a TGAFile instance from the path in tga_file_dict.
+        1. Create a lazy TGAFile instance from the path in tga_file_dict (only the header is parsed),
+           or load the parsed file from the parse cache if one is set.
         2. Look up the metadata from gspread_model using either 'id' or 'name'.
-        3. Return (tga_file, metadata) or signal an error if not found.
+        3. Add downsampling and dm/dt to the lazy query plan of the TGAFile.
+        4. Return (tga_file, metadata) or signal an error if not found.
+        The data block is only read when tga_file.data is accessed, e.g. when the entry is saved.
         """
-        file_id = tga_file_dict["id"]
-        file_path = tga_file_dict["path"]
-
-        tga_file = TGAFile(file_path)  # Loads Polars DataFrame in tga_file.data
+        tga_file = self.open_tga_file(tga_file_dict)
 
-        downsample_frequency = self.config.get("downsample_frequency", None)
+        metadata = self.lookup_metadata(tga_file_dict, tga_file, gspread_model)
+        if not metadata:
+            return None, None
 
-        if downsample_frequency:
-            tga_file.downsample(downsample_frequency)
+        self.transform(tga_file)
+        return tga_file, metadata
 
-        if self.config.get("calculate_dm_dt", False):
-            tga_file.calculate_dm_dt_in_s()
+    def open_tga_file(self, tga_file_dict) -> TGAFile:
+        """Open the file from the parse cache if one is set, otherwise as a lazy TGAFile."""
+        file_path = tga_file_dict["path"]
+        if self.parse_cache is not None:
+            return self.parse_cache.load(file_path)
+        return TGAFile(file_path, lazy=True)  # Parses the header, tga_file.data is loaded on first use
 
-        # Attempt to look up metadata by ID first
-        metadata = gspread_model.get_metadata(file_id)
+    def lookup_metadata(self, tga_file_dict, tga_file: TGAFile, gspread_model: GoogleSpreadsheetModel):
+        """Look up the metadata by the file ID first, then by the name stored in the file header."""
+        metadata = gspread_model.get_metadata(tga_file_dict["id"])
         if not metadata:
             # fallback: possibly use 'name' field in tga_file.metadata
             name_in_file = tga_file.metadata.get("name", "")
             metadata = gspread_model.get_metadata(name_in_file)
 
         if not metadata:
-            print("Metadata not found for file: " + file_path.split("/")[-1])
-            return None, None
+            print("Metadata not found for file: " + tga_file_dict["path"].split("/")[-1])
+            return None
+
+        return metadata
+
+    def preprocessing_config(self) -> dict:
+        """The parts of the config that change the stored sample data, recorded in the import manifest."""
+        downsample_frequency = self.config.get("downsample_frequency", None)
+        downsampler = self.downsampler()
+        derivatives = self.derivatives()
+        return {
+            "downsample_frequency": float(downsample_frequency) if downsample_frequency else None,
+            "downsample_method": downsampler.config() if downsampler else None,
+            "calculate_dm_dt": bool(self.config.get("calculate_dm_dt", False)),
+            "dtg": "; ".join(derivative.config() for derivative in derivatives) if derivatives else None,
+        }
 
-        return tga_file, metadata
\ No newline at end of file
+    def downsampler(self) -> Downsampler | None:
+        """
+        The downsampling at import, None without "downsample_frequency" (seconds). "downsample_method" selects
+        "mean" (default), "envelope", "lttb" or "adaptive", "downsample_options" holds further parameters
+        of the method, see fastTGA.models.downsampling.
+        """
+        downsample_frequency = self.config.get("downsample_frequency", None)
+        if not downsample_frequency:
+            return None
+        return make_downsampler(self.config.get("downsample_method") or "mean", float(downsample_frequency),
+                                **(self.config.get("downsample_options") or {}))
+
+    def derivatives(self) -> list[Derivative]:
+        """
+        The derivative columns added at import: dm/dt with "calculate_dm_dt" and dm/dT with "calculate_dm_dT",
+        both computed with "dtg_method" ("central", "savgol" or "regression"), "dtg_window" and "dtg_polyorder".
+        """
+        options = {
+            "method": self.config.get("dtg_method", METHOD_CENTRAL),
+            "window": int(self.config.get("dtg_window", 11)),
+            "polyorder": int(self.config.get("dtg_polyorder", 2)),
+        }
+        derivatives = []
+        if self.config.get("calculate_dm_dt", False):
+            derivatives.append(Derivative("dm_mg", "t_s", **options))
+        if self.config.get("calculate_dm_dT", False):
+            derivatives.append(Derivative("dm_mg", "T_C", **options))
+        return derivatives
+
+    def transform(self, tga_file: TGAFile):
+        """Apply downsampling and the dm/dt (and dm/dT) calculation as configured."""
+        downsampler = self.downsampler()
+        if downsampler is not None:
+            tga_file.apply_downsampler(downsampler)
+
+        for derivative in self.derivatives():
+            tga_file.calculate_derivative(derivative)
+
+    def prepare_tga_file(self, tga_file_dict) -> tuple[TGAFile, bool | None]:
+        """
+        Open, transform and materialize a single file without any metadata lookup.
+        Used by the worker processes of the parallel import, so the result must be picklable.
+        The parse cache is only read and written here, counting the request and eviction are left to the
+        calling process (TGAParseCache.fetch).
+
+        Returns:
+            tuple[TGAFile, bool | None]: The file and whether it was a parse cache hit, None without a cache.
+        """
+        if self.parse_cache is not None:
+            tga_file, cache_hit = self.parse_cache.fetch(tga_file_dict["path"])
+        else:
+            tga_file, cache_hit = TGAFile(tga_file_dict["path"], lazy=True), None
+        self.transform(tga_file)
+        return tga_file.collect(), cache_hit
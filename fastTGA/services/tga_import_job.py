@@ -0,0 +1,57 @@
+import time
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from fastTGA.models.google_spreadsheet_model import GoogleSpreadsheetModel
+from fastTGA.models.txt_directory_model import TXTDirectoryModel
+from fastTGA.services.tga_import_service import TGAImportService
+
+
+class TGAImportJob(QThread):
+    """
+    Runs TGAImportService.import_from_txt_directory in a background thread, so the GUI stays responsive.
+    The dataset model emits its per-entry signals from this thread, Qt queues them to the receivers.
+    """
+    progress = pyqtSignal(int, int)  # files done, files total
+    throughput = pyqtSignal(float, float, float)  # files/s, MB/s, ETA in s
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self,
+                 import_service: TGAImportService,
+                 gspread_model: GoogleSpreadsheetModel,
+                 txtmodel: TXTDirectoryModel,
+                 workers: int = 1,
+                 parent=None):
+        super().__init__(parent)
+        self.import_service = import_service
+        self.gspread_model = gspread_model
+        self.txtmodel = txtmodel
+        self.workers = workers
+
+        self._start_time = None
+
+    def run(self):
+        self._start_time = time.perf_counter()
+        try:
+            self.import_service.import_from_txt_directory(self.gspread_model,
+                                                          self.txtmodel,
+                                                          workers=self.workers,
+                                                          progress_callback=self._on_progress)
+        except Exception as e:
+            self.error_occurred.emit(f"Import failed: {e}")
+
+    def cancel(self):
+        self.import_service.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.import_service.cancelled
+
+    def _on_progress(self, files_done, files_total, bytes_done):
+        elapsed = max(time.perf_counter() - self._start_time, 1e-9)
+        files_per_s = files_done / elapsed
+        mb_per_s = bytes_done / 1e6 / elapsed
+        eta_s = (files_total - files_done) / files_per_s if files_per_s > 0 else 0.0
+
+        self.progress.emit(files_done, files_total)
+        self.throughput.emit(files_per_s, mb_per_s, eta_s)
@@ -1,20 +1,185 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 from fastTGA.models.google_spreadsheet_model import GoogleSpreadsheetModel
 from fastTGA.models.tga_dataset_model import TGADatasetModel
+from fastTGA.models.tga_file import TGAFile
 from fastTGA.models.txt_directory_model import TXTDirectoryModel
 from fastTGA.services.tga_entry_preparator import TGAEntryPreparator
 
 
+# Spawning the worker processes takes seconds, smaller imports are faster without the pool
+MIN_PARALLEL_FILES = 16
+
 class TGAImportService:
     def __init__(self, dataset_model: TGADatasetModel, entry_preparator: TGAEntryPreparator):
         self.dataset_model = dataset_model
         self.entry_preparator = entry_preparator
+        # Copy of entry_preparator used by the running import, see import_from_txt_directory
+        self._preparator = entry_preparator
+
+        # Number of samples skipped by the last import because they were up to date
+        self.skipped = 0
+
+        # The parallel import only starts the process pool for at least this many files to (re)build
+        self.min_parallel_files = MIN_PARALLEL_FILES
+
+        # Progress of the running import
+        self._cancel_requested = False
+        self._progress_callback = None
+        self._files_done = 0
+        self._files_total = 0
+        self._bytes_done = 0
+
+    def cancel(self):
+        """Request cancellation, the import stops after the file that is currently committed."""
+        self._cancel_requested = True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_requested
+
+    def _report_progress(self, file_info):
+        self._files_done += 1
+        self._bytes_done += os.path.getsize(file_info["path"])
+        if self._progress_callback is not None:
+            self._progress_callback(self._files_done, self._files_total, self._bytes_done)
 
     def import_from_txt_directory(self, gspread_model: GoogleSpreadsheetModel,
-                                txtmodel: TXTDirectoryModel):
-        """Moved from TGADatasetModel.create"""
+                                txtmodel: TXTDirectoryModel, workers: int = 1, incremental: bool = True,
+                                progress_callback=None):
+        """
+        Import all files of txtmodel into the dataset model.
+
+        Args:
+            gspread_model (GoogleSpreadsheetModel): Source of the sample metadata.
+            txtmodel (TXTDirectoryModel): Directory model listing the TXT exports.
+            workers (int, optional): Number of worker processes. With more than one worker and at least
+                min_parallel_files files to (re)build, the files are parsed and transformed in a process pool.
+                Defaults to 1 (serial import).
+            incremental (bool, optional): Skip samples whose source file content and preprocessing config
+                match the import manifest of the dataset. Their metadata rows are still updated. Defaults to True.
+            progress_callback (callable, optional): Called as progress_callback(files_done, files_total, bytes_done)
+                after every file. The serial import counts the files in txt_files order, the parallel import
+                counts skipped files while looking them up and the others as they are committed.
+        """
+        self.skipped = 0
+        self._cancel_requested = False
+        self._progress_callback = progress_callback
+        self._files_done = 0
+        self._files_total = len(txtmodel.txt_files)
+        self._bytes_done = 0
+        # the config can be changed while the import runs, every file uses the config of the start,
+        # which is also the one recorded in the manifest
+        self._preparator = self.entry_preparator.copy()
+        preprocessing = self._preparator.preprocessing_config()
+
+        # metadata.parquet is written once at the end of the batch instead of once per file
+        with self.dataset_model.batch():
+            if workers is not None and workers > 1:
+                self._import_parallel(gspread_model, txtmodel, workers, incremental, preprocessing)
+                return
+
+            for file_info in txtmodel.txt_files:
+                if self._cancel_requested:
+                    return
+                self._import_file(gspread_model, file_info, incremental, preprocessing)
+                self._report_progress(file_info)
+
+    def _import_file(self, gspread_model: GoogleSpreadsheetModel, file_info, incremental: bool, preprocessing: dict):
+        metadata = self._lookup_pending(gspread_model, file_info, incremental, preprocessing)
+        if metadata is None:
+            return
+
+        self._build_entry(file_info, metadata, preprocessing)
+
+    def _build_entry(self, file_info, metadata, preprocessing: dict):
+        tga_file = self._preparator.open_tga_file(file_info)
+        self._preparator.transform(tga_file)
+        self.dataset_model.add_entry(tga_file, metadata, preprocessing=preprocessing)
+
+    def _lookup_pending(self, gspread_model: GoogleSpreadsheetModel, file_info, incremental: bool,
+                        preprocessing: dict):
+        """
+        Look up the metadata from the file header and return it if the sample needs to be (re)built,
+        None if it has no metadata or is up to date. Only the header is read, so unchanged exports are
+        neither parsed nor stored in the parse cache.
+        """
+        header = TGAFile(file_info["path"], lazy=True)
+        metadata = self._preparator.lookup_metadata(file_info, header, gspread_model)
+        if metadata is None:
+            return None
+        if incremental and self._skip_unchanged(file_info, header, metadata, preprocessing):
+            return None
+        return metadata
+
+    def _skip_unchanged(self, file_info, tga_file: TGAFile, metadata, preprocessing: dict) -> bool:
+        """Update only the metadata row of samples that are up to date and report whether they were skipped."""
+        if not self.dataset_model.is_entry_current(tga_file.id, file_info["path"], preprocessing):
+            return False
+        self.dataset_model.update_metadata(tga_file, metadata)
+        self.skipped += 1
+        return True
+
+    def _import_parallel(self, gspread_model: GoogleSpreadsheetModel,
+                         txtmodel: TXTDirectoryModel, workers: int, incremental: bool, preprocessing: dict):
+        """
+        Worker processes parse and transform the files, the calling thread is the single writer that
+        commits the results to the dataset model. Results are committed in the order of txtmodel.txt_files,
+        so the resulting dataset is identical to the serial import. With fewer than min_parallel_files files
+        to (re)build they are built in this process instead.
+        """
+        # Metadata lookup needs the spreadsheet model, so it stays in this process. Only the header is read.
+        jobs = []
         for file_info in txtmodel.txt_files:
-            tga_file, metadata = self.entry_preparator.prepare_entry_data(
-                file_info, gspread_model
-            )
-            if tga_file is not None and metadata is not None:
-                self.dataset_model.add_entry(tga_file, metadata, save=True)
\ No newline at end of file
+            if self._cancel_requested:
+                return
+            metadata = self._lookup_pending(gspread_model, file_info, incremental, preprocessing)
+            if metadata is None:
+                # skipped or without metadata, nothing left to do for this file
+                self._report_progress(file_info)
+            else:
+                jobs.append((file_info, metadata))
+
+        if len(jobs) < self.min_parallel_files:
+            for file_info, metadata in jobs:
+                if self._cancel_requested:
+                    return
+                self._build_entry(file_info, metadata, preprocessing)
+                self._report_progress(file_info)
+            return
+
+        # Keep a bounded number of files in flight so finished frames do not pile up in memory
+        max_pending = 2 * workers
+        pending = deque()
+        # polars' thread pool does not survive fork(), so workers are always spawned
+        spawn_context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=spawn_context) as executor:
+            for file_info, metadata in jobs:
+                if self._cancel_requested:
+                    break
+                future = executor.submit(self._preparator.prepare_tga_file, file_info)
+                pending.append((file_info, future, metadata))
+                if len(pending) >= max_pending:
+                    self._commit_next(pending, preprocessing)
+
+            while pending and not self._cancel_requested:
+                self._commit_next(pending, preprocessing)
+
+            # drop files that were not committed yet
+            for _, future, _ in pending:
+                future.cancel()
+
+        # workers never evict, several processes evicting the same cache folder would race
+        if self._preparator.parse_cache is not None:
+            self._preparator.parse_cache.evict()
+
+    def _commit_next(self, pending: deque, preprocessing: dict):
+        file_info, future, metadata = pending.popleft()
+        tga_file, cache_hit = future.result()
+        if cache_hit is not None:
+            self._preparator.parse_cache.record(cache_hit)
+        self.dataset_model.add_entry(tga_file, metadata, preprocessing=preprocessing)
+        self._report_progress(file_info)
@@ -107,6 +107,23 @@ class Ui_DataWidget(object):
         self.generate_hdf5_pushButton = QtWidgets.QPushButton(parent=DataWidget)
         self.generate_hdf5_pushButton.setObjectName("generate_hdf5_pushButton")
         self.verticalLayout.addWidget(self.generate_hdf5_pushButton)
+        self.horizontalLayout_9 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_9.setObjectName("horizontalLayout_9")
+        self.import_progressBar = QtWidgets.QProgressBar(parent=DataWidget)
+        self.import_progressBar.setProperty("value", 0)
+        self.import_progressBar.setObjectName("import_progressBar")
+        self.horizontalLayout_9.addWidget(self.import_progressBar)
+        self.cancel_import_pushButton = QtWidgets.QPushButton(parent=DataWidget)
+        self.cancel_import_pushButton.setEnabled(False)
+        self.cancel_import_pushButton.setObjectName("cancel_import_pushButton")
+        self.horizontalLayout_9.addWidget(self.cancel_import_pushButton)
+        self.horizontalLayout_9.setStretch(0, 2)
+        self.horizontalLayout_9.setStretch(1, 1)
+        self.verticalLayout.addLayout(self.horizontalLayout_9)
+        self.import_status_label = QtWidgets.QLabel(parent=DataWidget)
+        self.import_status_label.setText("")
+        self.import_status_label.setObjectName("import_status_label")
+        self.verticalLayout.addWidget(self.import_status_label)
         self.logging_plainTextEdit = QtWidgets.QPlainTextEdit(parent=DataWidget)
         self.logging_plainTextEdit.setObjectName("logging_plainTextEdit")
         self.verticalLayout.addWidget(self.logging_plainTextEdit)
@@ -130,6 +147,7 @@ class Ui_DataWidget(object):
         self.label_5.setText(_translate("DataWidget", "ID Lookup Col"))
         self.label_7.setText(_translate("DataWidget", "Lookup ID"))
         self.generate_hdf5_pushButton.setText(_translate("DataWidget", "Create Dataset"))
+        self.cancel_import_pushButton.setText(_translate("DataWidget", "Cancel"))
 
 
 if __name__ == "__main__":
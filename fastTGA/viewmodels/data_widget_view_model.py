@@ -1,8 +1,12 @@
+import os
+
 from PyQt6.QtCore import QObject, pyqtSignal
 
 from fastTGA.models.google_spreadsheet_model import GoogleSpreadsheetModel
 from fastTGA.models.tga_dataset_model import TGADatasetModel
 from fastTGA.models.txt_directory_model import TXTDirectoryModel
+from fastTGA.services.parse_cache import TGAParseCache
+from fastTGA.services.tga_import_job import TGAImportJob
 from fastTGA.services.tga_entry_preparator import TGAEntryPreparator
 from fastTGA.services.tga_import_service import TGAImportService
 
@@ -13,6 +17,9 @@ class DataWidgetViewModel(QObject):
     available_columns_updated = pyqtSignal(list, int)
     print_message = pyqtSignal(str)
     new_example_id_available = pyqtSignal(str)
+    import_progress = pyqtSignal(int, int)
+    import_status = pyqtSignal(str)
+    import_running = pyqtSignal(bool)
 
     def __init__(self,
                  txt_directory_model: TXTDirectoryModel,
@@ -24,8 +31,12 @@ class DataWidgetViewModel(QObject):
         self.gspread_model = gspread_model
         self.tga_dataset_model = tga_dataset_model
 
+        self.import_workers = os.cpu_count() or 1
+        self.import_job = None
+        self.parse_cache = TGAParseCache()
         self.tga_data_entry_preparator = TGAEntryPreparator({"calculate_dm_dt":False,
-                                                       "downsample_frequency":None})
+                                                       "downsample_frequency":None},
+                                                      parse_cache=self.parse_cache)
 
         self.gspread_model.initialized.connect(self.gspread_initialized)
         self.gspread_model.worksheet_loaded.connect(self.worksheet_data_available)
@@ -86,8 +97,45 @@ class DataWidgetViewModel(QObject):
         self.tga_data_entry_preparator.config["calculate_dm_dt"] = state
 
     def create_dataset(self):
-        tga_import_service = TGAImportService(self.tga_dataset_model, self.tga_data_entry_preparator)
-        tga_import_service.import_from_txt_directory(self.gspread_model, self.txt_directory_model)
+        if self.import_job is not None and self.import_job.isRunning():
+            self.print_message.emit("An import is already running")
+            return
+
+        # a copy, so changing the settings does not affect the running import
+        tga_import_service = TGAImportService(self.tga_dataset_model, self.tga_data_entry_preparator.copy())
+        self.import_job = TGAImportJob(tga_import_service,
+                                       self.gspread_model,
+                                       self.txt_directory_model,
+                                       workers=self.import_workers)
+        self.import_job.progress.connect(self.import_progress)
+        self.import_job.throughput.connect(self.import_throughput_updated)
+        self.import_job.error_occurred.connect(self.send_print_message)
+        self.import_job.finished.connect(self.import_finished)
+
+        self.import_running.emit(True)
+        self.import_job.start()
+
+    def cancel_import(self):
+        if self.import_job is not None and self.import_job.isRunning():
+            self.print_message.emit("Cancelling import...")
+            self.import_job.cancel()
+
+    def import_throughput_updated(self, files_per_s, mb_per_s, eta_s):
+        self.import_status.emit(f"{files_per_s:.1f} files/s, {mb_per_s:.1f} MB/s, ETA {eta_s:.0f} s")
+
+    def import_finished(self):
+        tga_import_service = self.import_job.import_service
+        if self.import_job.cancelled:
+            self.print_message.emit("Import cancelled")
+        self.print_message.emit(f"Skipped {tga_import_service.skipped} unchanged samples")
+
+        stats = self.parse_cache.stats()
+        self.print_message.emit(f"Parse cache: {stats['hits']} hits, {stats['misses']} misses, "
+                                f"{stats['evictions']} evictions, {stats['size_bytes'] / 1e6:.1f} MB")
+        self.import_running.emit(False)
+
+    def set_import_workers(self, workers):
+        self.import_workers = max(1, int(workers))
 
     def set_sample_frequency(self, frequency):
         self.tga_data_entry_preparator.config["downsample_frequency"] = frequency
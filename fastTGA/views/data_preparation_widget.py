@@ -31,6 +31,7 @@ class DataPreparationWidget(QWidget, Ui_TGADataPreparationWidget):
         # Connect signals to slots
         self.dmdt_checkBox.stateChanged.connect(self.on_dmdt_checkbox_state_changed)
         self.sample_frequency_lineEdit.textChanged.connect(self.on_sample_frequency_text_changed)
+        self.data_widget_view_model.import_running.connect(self.set_import_running)
 
         self.sample_frequency_lineEdit.setText("5")
         self.dmdt_checkBox.setCheckState(Qt.CheckState.Checked)
@@ -58,4 +59,14 @@ class DataPreparationWidget(QWidget, Ui_TGADataPreparationWidget):
             self.data_widget_view_model.set_sample_frequency(frequency_value)
         except ValueError:
             # Log error or notify the user; for now, we simply print the error.
-            print(f"Invalid frequency entered: {frequency}")
\ No newline at end of file
+            print(f"Invalid frequency entered: {frequency}")
+
+    def set_import_running(self, running: bool) -> None:
+        """
+        Disable the preprocessing settings while an import is running.
+
+        Args:
+            running (bool): Whether an import is running.
+        """
+        self.dmdt_checkBox.setEnabled(not running)
+        self.sample_frequency_lineEdit.setEnabled(not running)
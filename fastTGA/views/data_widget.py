@@ -16,6 +16,9 @@ class DataWidget(QWidget, Ui_DataWidget):
         self.data_widget_view_model.available_columns_updated.connect(self.initliaze_google_lookup_column)
         self.data_widget_view_model.print_message.connect(self.print_message)
         self.data_widget_view_model.new_example_id_available.connect(self.update_gspread_example_id)
+        self.data_widget_view_model.import_progress.connect(self.update_import_progress)
+        self.data_widget_view_model.import_status.connect(self.import_status_label.setText)
+        self.data_widget_view_model.import_running.connect(self.set_import_running)
 
 
         # Connect signals
@@ -25,6 +28,7 @@ class DataWidget(QWidget, Ui_DataWidget):
         self.google_lookup_column_comboBox.currentTextChanged.connect(self.data_widget_view_model.set_gspread_lookup_column)
         self.select_api_pushButton.clicked.connect(self.open_api_selection)
         self.generate_hdf5_pushButton.clicked.connect(self.data_widget_view_model.create_dataset)
+        self.cancel_import_pushButton.clicked.connect(self.data_widget_view_model.cancel_import)
         self.select_output_directory_pushButton.clicked.connect(self.open_directory_dialog_for_output)
         self.filename_regex_lineEdit.setText(r"RT[0-9]{1,}")
 
@@ -74,4 +78,17 @@ class DataWidget(QWidget, Ui_DataWidget):
 
     def open_directory_dialog_for_output(self):
         directory = QtWidgets.QFileDialog.getExistingDirectory(self, "Select Directory")
-        self.data_widget_view_model.select_output_directory(directory)
\ No newline at end of file
+        self.data_widget_view_model.select_output_directory(directory)
+
+    def update_import_progress(self, files_done, files_total):
+        self.import_progressBar.setMaximum(max(files_total, 1))
+        self.import_progressBar.setValue(files_done)
+
+    def set_import_running(self, running):
+        self.generate_hdf5_pushButton.setEnabled(not running)
+        self.cancel_import_pushButton.setEnabled(running)
+        # the running import reads the directories, the file list and the spreadsheet
+        for widget in (self.open_txt_directory_pushButton, self.select_output_directory_pushButton,
+                       self.filename_regex_lineEdit, self.select_api_pushButton,
+                       self.google_sheetnames_comboBox, self.google_lookup_column_comboBox):
+            widget.setEnabled(not running)
@@ -8,7 +8,12 @@ setup(
         'PyQt6',
         'gspread',
         'polars',
+        'numpy',
     ],
+    extras_require={
+        # memory mapped reads of datasets stored as Arrow IPC
+        'ipc': ['pyarrow'],
+    },
     entry_points={
         'console_scripts': [
             'fastTGA=fastTGA.main:main',